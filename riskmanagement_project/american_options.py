@@ -0,0 +1,190 @@
+import numpy as np
+
+from black_scholes import PutGreeks, _scalar
+
+
+'''
+    ------ AMERICAN PUT PRICING ------
+    Early-exercise puts, for hedges built from listed (American) equity puts.
+    1. american_put_binomial         - Cox-Ross-Rubinstein lattice, vectorized across options: every option is one
+                                       row of a (options x nodes) array and backward induction loops over the
+                                       lattice steps only. Suited to single valuations and to run_simulation
+    2. american_put_binomial_greeks  - price, delta, gamma and theta read off the first lattice layers; vega and
+                                       rho by central bump-and-reprice
+    3. american_put_lsm              - Longstaff-Schwartz regression over simulated risk-neutral paths for batch
+                                       valuation; every option rescales one shared set of Brownian paths, and the
+                                       per-option regressions are solved together as stacked 3x3 systems
+
+    All functions take the same broadcastable arguments as black_scholes_put. Expired points are priced at intrinsic
+    value with the same Greek conventions as black_scholes_put_greeks.
+'''
+
+DEFAULT_LATTICE_STEPS = 100
+MAX_LATTICE_ELEMENTS = 4_000_000  # Options x lattice nodes (or options x LSM paths) held at once
+VEGA_BUMP = 1e-3
+RHO_BUMP = 1e-4
+
+
+def _broadcast(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility):
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                   (equity_price, put_strike, time_to_expiration, risk_free_rate, volatility)))
+    return arrays[0].shape, [array.ravel() for array in arrays]
+
+
+def _lattice(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility, steps, keep_layers=False):
+    """Backward induction on 1-D arrays of live options; optionally returns the first two layers as well."""
+    dt = time_to_expiration / steps
+    up = np.exp(volatility * np.sqrt(dt))
+    down = 1 / up
+    discount = np.exp(-risk_free_rate * dt)
+    probability = (np.exp(risk_free_rate * dt) - down) / (up - down)
+
+    strike = put_strike[:, np.newaxis]
+    prices = equity_price[:, np.newaxis] * up[:, np.newaxis] ** (2 * np.arange(steps + 1) - steps)
+    values = np.maximum(strike - prices, 0.0)
+    layers = {}
+    for step in range(steps - 1, -1, -1):
+        prices = prices[:, 1:step + 2] * down[:, np.newaxis]
+        values = discount[:, np.newaxis] * (probability[:, np.newaxis] * values[:, 1:step + 2]
+                                            + (1 - probability[:, np.newaxis]) * values[:, :step + 1])
+        np.maximum(values, strike - prices, out=values)
+        if keep_layers and step <= 2:
+            layers[step] = (prices, values)
+    return (values[:, 0], layers, dt) if keep_layers else values[:, 0]
+
+
+def _chunked(function, options, steps):
+    """Run function over the live options in chunks that bound the lattice memory."""
+    chunk = max(1, MAX_LATTICE_ELEMENTS // (steps + 1))
+    return [function(*(array[start:start + chunk] for array in options))
+            for start in range(0, options[0].size, chunk)]
+
+
+def american_put_binomial(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility,
+                          steps=DEFAULT_LATTICE_STEPS):
+    """
+    Price American puts on a Cox-Ross-Rubinstein binomial lattice.
+
+    Parameters:
+    equity_price, put_strike, time_to_expiration, risk_free_rate, volatility: As in black_scholes_put
+                                                                              (scalars or broadcastable arrays).
+    steps (int): Lattice steps per option.
+
+    Returns:
+    float or array: American put prices, broadcast to the common shape of the inputs.
+    """
+    shape, (spot, strike, time, rate, sigma) = _broadcast(equity_price, put_strike, time_to_expiration,
+                                                          risk_free_rate, volatility)
+    price = np.maximum(strike - spot, 0.0)
+    live = time > 0
+    if live.any():
+        price[live] = np.concatenate(_chunked(
+            lambda *options: _lattice(*options, steps), [x[live] for x in (spot, strike, time, rate, sigma)], steps))
+    return _scalar(price.reshape(shape))
+
+
+def american_put_binomial_greeks(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility,
+                                 steps=DEFAULT_LATTICE_STEPS):
+    """
+    American put price and Greeks from the binomial lattice, in the units of black_scholes_put_greeks.
+
+    Returns:
+    PutGreeks: price, delta, gamma, vega, theta and rho arrays of the common input shape.
+    """
+    shape, (spot, strike, time, rate, sigma) = _broadcast(equity_price, put_strike, time_to_expiration,
+                                                          risk_free_rate, volatility)
+    live = time > 0
+    greeks = {
+        'price': np.maximum(strike - spot, 0.0),
+        'delta': np.where(spot < strike, -1.0, 0.0),
+        'gamma': np.zeros_like(spot), 'vega': np.zeros_like(spot),
+        'theta': np.zeros_like(spot), 'rho': np.zeros_like(spot),
+    }
+
+    def lattice_greeks(spot, strike, time, rate, sigma):
+        price, layers, dt = _lattice(spot, strike, time, rate, sigma, steps, keep_layers=True)
+        (prices_1, values_1), (prices_2, values_2) = layers[1], layers[2]
+        delta = (values_1[:, 1] - values_1[:, 0]) / (prices_1[:, 1] - prices_1[:, 0])
+        delta_up = (values_2[:, 2] - values_2[:, 1]) / (prices_2[:, 2] - prices_2[:, 1])
+        delta_down = (values_2[:, 1] - values_2[:, 0]) / (prices_2[:, 1] - prices_2[:, 0])
+        gamma = (delta_up - delta_down) / (0.5 * (prices_2[:, 2] - prices_2[:, 0]))
+        theta = (values_2[:, 1] - price) / (2 * dt)
+        vega = (_lattice(spot, strike, time, rate, sigma + VEGA_BUMP, steps)
+                - _lattice(spot, strike, time, rate, sigma - VEGA_BUMP, steps)) / (2 * VEGA_BUMP)
+        rho = (_lattice(spot, strike, time, rate + RHO_BUMP, sigma, steps)
+               - _lattice(spot, strike, time, rate - RHO_BUMP, sigma, steps)) / (2 * RHO_BUMP)
+        return np.stack([price, delta, gamma, vega, theta, rho])
+
+    if live.any() and steps >= 2:
+        live_greeks = np.concatenate(_chunked(lattice_greeks, [x[live] for x in (spot, strike, time, rate, sigma)],
+                                              steps), axis=1)
+        for name, values in zip(('price', 'delta', 'gamma', 'vega', 'theta', 'rho'), live_greeks):
+            greeks[name][live] = values
+    return PutGreeks(**{name: _scalar(values.reshape(shape)) for name, values in greeks.items()})
+
+
+def american_put_lsm(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility,
+                     n_paths=20_000, n_exercise=50, seed=0):
+    """
+    Price American puts by Longstaff-Schwartz regression over simulated risk-neutral GBM paths.
+
+    Continuation values are regressed on (1, S/K, (S/K)^2) over in-the-money paths at each of n_exercise evenly
+    spaced exercise dates. Antithetic paths are used, and a put is never worth less than its intrinsic value.
+
+    Parameters:
+    equity_price, put_strike, time_to_expiration, risk_free_rate, volatility: As in black_scholes_put.
+    n_paths (int): Simulated paths (shared by every option).
+    n_exercise (int): Exercise dates per option.
+    seed (int): Seed of the simulated paths.
+
+    Returns:
+    float or array: American put prices, broadcast to the common shape of the inputs.
+    """
+    shape, (spot, strike, time, rate, sigma) = _broadcast(equity_price, put_strike, time_to_expiration,
+                                                          risk_free_rate, volatility)
+    price = np.maximum(strike - spot, 0.0)
+    live = time > 0
+    if not live.any():
+        return _scalar(price.reshape(shape))
+
+    rng = np.random.default_rng(seed)
+    half = -(-n_paths // 2)
+    normals = rng.standard_normal(size=(half, n_exercise))
+    brownian = np.cumsum(np.concatenate([normals, -normals])[:n_paths], axis=1)
+
+    def lsm(spot, strike, time, rate, sigma):
+        # Every option scales the shared Brownian paths by its own time step, drift and volatility
+        dt = (time / n_exercise)[:, np.newaxis]
+        drift = (rate[:, np.newaxis] - 0.5 * sigma[:, np.newaxis] ** 2) * dt
+        diffusion = sigma[:, np.newaxis] * np.sqrt(dt)
+        discount = np.exp(-rate[:, np.newaxis] * dt)
+        moneyness = (spot / strike)[:, np.newaxis]
+
+        def level(date):
+            return moneyness * np.exp(drift * (date + 1) + diffusion * brownian[:, date])
+
+        # Cash flows in units of the strike, working back from expiry
+        cash = np.maximum(1 - level(n_exercise - 1), 0.0)
+        for date in range(n_exercise - 2, -1, -1):
+            cash *= discount
+            x = level(date)
+            exercise = np.maximum(1 - x, 0.0)
+            in_the_money = exercise > 0
+            # Least squares on (1, x, x^2) over in-the-money paths via the 3x3 normal equations of each option
+            powers = [in_the_money.astype(float)]
+            for _ in range(4):
+                powers.append(powers[-1] * x)
+            moments = np.stack([power.sum(axis=1) for power in powers], axis=-1)
+            normal_matrix = moments[:, [[0, 1, 2], [1, 2, 3], [2, 3, 4]]]
+            targets = np.stack([(power * cash).sum(axis=1) for power in powers[:3]], axis=-1)
+            coefficients = np.einsum('kpq,kq->kp', np.linalg.pinv(normal_matrix), targets)
+            continuation = coefficients[:, [0]] + x * (coefficients[:, [1]] + x * coefficients[:, [2]])
+            cash = np.where(in_the_money & (exercise > continuation), exercise, cash)
+        return strike * discount[:, 0] * cash.mean(axis=1)
+
+    options = [x[live] for x in (spot, strike, time, rate, sigma)]
+    chunk = max(1, MAX_LATTICE_ELEMENTS // n_paths)
+    values = np.concatenate([lsm(*(x[start:start + chunk] for x in options))
+                             for start in range(0, options[0].size, chunk)])
+    price[live] = np.maximum(values, price[live])
+    return _scalar(price.reshape(shape))
@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from historical_bootstrap import load_price_history
+from monte_carlo import MonteCarloSimulator
+
+
+'''
+    ------ HISTORICAL BACKTEST ------
+    Replays the put-roll rule of OptionSimulator.run_simulation (roll from strike_price_PUT to trigger_price_PUT
+    on the first day trigger_price is reached) over real price histories instead of simulated paths.
+    1. walk_forward_windows() cuts a history into overlapping windows of time_horizon_step days, one per start
+       day (every `stride` days), as zero-copy views of the price array
+    2. Each window is rescaled so it starts at Parameters.initial_equity_price: strikes and trigger keep their
+       moneyness whatever the stock's price level was
+    3. The windows are stacked like simulated paths and valued in one MonteCarloSimulator.value_hedged_position
+       call, so every window of a ticker is evaluated in parallel; tickers run in separate processes
+    4. Each window gets its P&L, return, unhedged (shares-only) P&L, hedge P&L and maximum drawdown;
+       summarize_backtest() aggregates them per ticker
+
+    The puts are priced with Black-Scholes at Parameters.volatility, as in the simulations. The cached
+    histories carry no dates, so windows are identified by their start day in the history.
+'''
+
+
+def walk_forward_windows(prices, steps, stride=1):
+    """(n_windows, steps + 1) windows of consecutive prices and their start days; day 0 is the entry day."""
+    if prices.size < steps + 1:
+        raise ValueError(f"{prices.size} prices cannot fill one window of {steps} days")
+    windows = sliding_window_view(prices, steps + 1)[::stride]
+    return windows, np.arange(0, prices.size - steps, stride)
+
+
+def backtest_windows(parameters, prices, stride=1):
+    """
+    Run the put-roll rule over every walk-forward window of one price history.
+
+    Parameters:
+    parameters (Parameters): Strategy and pricing inputs; time_horizon_step is the window length.
+    prices (array): Daily closing prices, oldest first.
+    stride (int): Days between consecutive window starts.
+
+    Returns:
+    DataFrame: One row per window.
+    """
+    steps = parameters.time_horizon_step
+    windows, starts = walk_forward_windows(np.asarray(prices, dtype=float), steps, stride)
+    entry_prices = windows[:, 0]
+    paths = windows[:, 1:] * (parameters.initial_equity_price / entry_prices)[:, np.newaxis]
+
+    simulator = MonteCarloSimulator(parameters)
+    results = simulator.value_hedged_position(paths)
+    initial_value = simulator.initial_position_value()
+    position_values = results.position_values
+    terminal_values = results.terminal_position_values
+    pnl = terminal_values - initial_value
+    unhedged_pnl = parameters.num_shares * (paths[:, -1] - parameters.initial_equity_price) \
+        - results.margin_interest[-1]
+
+    # Drawdown of the position value from its running peak, inception included
+    values = np.column_stack([np.full(len(windows), initial_value), position_values])
+    drawdowns = 1 - values / np.maximum.accumulate(values, axis=1)
+
+    return pd.DataFrame({
+        'Window': np.arange(len(windows)),
+        'Start Day': starts,
+        'End Day': starts + steps,
+        'Entry Price': entry_prices,
+        'Exit Price': windows[:, -1],
+        'Stock Return (%)': 100 * (windows[:, -1] / entry_prices - 1),
+        'Rolled': results.roll_days >= 0,
+        'Roll Day': results.roll_days,
+        'Initial Value': initial_value,
+        'Terminal Value': terminal_values,
+        'P&L': pnl,
+        'Return (%)': 100 * pnl / initial_value,
+        'Unhedged P&L': unhedged_pnl,
+        'Hedge P&L': pnl - unhedged_pnl,
+        'Max Drawdown (%)': 100 * drawdowns.max(axis=1),
+    })
+
+
+def _backtest_ticker(parameters, ticker, directory, stride):
+    frame = backtest_windows(parameters, load_price_history(ticker, directory), stride)
+    frame.insert(0, 'Ticker', ticker)
+    return frame
+
+
+def run_backtest(parameters, tickers, directory="STOCK_RESULTS", stride=1, max_workers=1):
+    """
+    Backtest the strategy on the cached histories of several tickers.
+
+    Parameters:
+    parameters (Parameters): Strategy and pricing inputs, applied to every ticker.
+    tickers (list of str): Tickers with price histories in directory (see load_price_history).
+    directory (str): Folder of the cached price histories.
+    stride (int): Days between consecutive window starts.
+    max_workers (int): Processes for the tickers; 1 runs in-process, None uses every CPU.
+
+    Returns:
+    DataFrame: One row per ticker and window.
+    """
+    jobs = [(parameters, ticker, directory, stride) for ticker in tickers]
+    if max_workers == 1 or len(jobs) == 1:
+        frames = [_backtest_ticker(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(_backtest_ticker, *zip(*jobs)))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize_backtest(windows):
+    """Performance statistics per ticker across its backtest windows."""
+    return windows.groupby('Ticker', sort=False).agg(**{
+        'Windows': ('Window', 'size'),
+        'Mean Return (%)': ('Return (%)', 'mean'),
+        'Std Return (%)': ('Return (%)', 'std'),
+        'Worst Return (%)': ('Return (%)', 'min'),
+        'Best Return (%)': ('Return (%)', 'max'),
+        'Win Rate (%)': ('P&L', lambda pnl: 100 * np.mean(pnl > 0)),
+        'Mean Hedge P&L': ('Hedge P&L', 'mean'),
+        'Mean Max Drawdown (%)': ('Max Drawdown (%)', 'mean'),
+        'Worst Drawdown (%)': ('Max Drawdown (%)', 'max'),
+        'Windows Rolled (%)': ('Rolled', lambda rolled: 100 * np.mean(rolled)),
+    }).reset_index()
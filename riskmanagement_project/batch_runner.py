@@ -0,0 +1,120 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from monte_carlo import MonteCarloSimulator
+from parameters import Parameters
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    ------ SCENARIO BATCH RUNNER ------
+    Runs a whole hedge book without the 13 interactive prompts of Parameters.from_user_input.
+    1. Load parameter sets from a JSON, YAML or CSV scenario file (one scenario per record/row)
+    2. Run every scenario through OptionSimulator's multi-path engine concurrently (one process per scenario)
+    3. Write one consolidated results table to BLACK_SCHOLES_RESULTS
+
+    Scenario records use the Parameters field names. Optional keys per record:
+        scenario  - name of the scenario (defaults to its position in the file)
+        n_paths   - number of simulated paths (defaults to --paths)
+        seed      - random seed (defaults to --seed)
+'''
+
+def load_scenarios(path):
+    """Load a list of scenario records (dicts) from a .json, .yaml/.yml or .csv file."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.csv':
+        records = pd.read_csv(path).to_dict(orient='records')
+    elif extension in ('.json', '.yaml', '.yml'):
+        with open(path) as file:
+            if extension == '.json':
+                records = json.load(file)
+            else:
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("PyYAML is required for YAML scenario files (pip install pyyaml)")
+                records = yaml.safe_load(file)
+        # Accept either a bare list or {"scenarios": [...]}
+        if isinstance(records, dict):
+            records = records.get('scenarios', [])
+    else:
+        raise ValueError(f"Unsupported scenario file type '{extension}' (use .json, .yaml, .yml or .csv)")
+
+    scenarios = []
+    for index, record in enumerate(records):
+        record = {key: value for key, value in record.items() if not pd.isna(value)}
+        record.setdefault('scenario', str(index))
+        scenarios.append(record)
+    return scenarios
+
+
+def run_scenario(scenario, n_paths=10_000, seed=42):
+    """Run one scenario record and return a flat dict of its parameters and results."""
+    record = dict(scenario)
+    name = str(record.pop('scenario'))
+    n_paths = int(record.pop('n_paths', n_paths))
+    seed = int(record.pop('seed', seed))
+    row = {'Scenario': name, 'Paths': n_paths, 'Seed': seed}
+
+    try:
+        parameters = Parameters.from_dict(record)
+        row['Stock Symbol'] = parameters.stock_symbol
+        row.update(parameters.to_dict())
+        start = time.perf_counter()
+        results = MonteCarloSimulator(parameters, seed=seed).run(n_paths)
+        row.update(results.summary().set_index('Statistic')['Total Position Value'].drop('Paths').to_dict())
+        row['Elapsed (s)'] = time.perf_counter() - start
+        row['Error'] = ''
+    except Exception as e:
+        row['Error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def run_batch(scenarios, n_paths=10_000, seed=42, max_workers=None):
+    """Run all scenarios concurrently and return one consolidated results DataFrame."""
+    n_scenarios = len(scenarios)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(executor.map(run_scenario, scenarios, [n_paths] * n_scenarios, [seed] * n_scenarios))
+
+    for row in rows:
+        if row['Error']:
+            logger.error(f"[-] Scenario {row['Scenario']} failed: {row['Error']}")
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scenario file through the option simulator.")
+    parser.add_argument('scenario_file', help="JSON, YAML or CSV file with one parameter set per record")
+    parser.add_argument('--paths', type=int, default=10_000, help="Simulated paths per scenario")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for scenarios that do not set one")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default=os.path.join("BLACK_SCHOLES_RESULTS", "batch_results.csv"),
+                        help="Consolidated results CSV")
+    parser.add_argument('--log-level', default=os.environ.get('LOG_LEVEL', 'INFO'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    scenarios = load_scenarios(args.scenario_file)
+    logger.info(f"[!] Loaded {len(scenarios)} scenarios from {args.scenario_file}")
+
+    start = time.perf_counter()
+    results = run_batch(scenarios, n_paths=args.paths, seed=args.seed, max_workers=args.workers)
+    logger.info(f"[!] Ran {len(results)} scenarios in {time.perf_counter() - start:.2f}s "
+                f"({(results['Error'] != '').sum()} failed)")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    results.to_csv(args.output, index=False)
+    logger.info(f"[!] Data saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
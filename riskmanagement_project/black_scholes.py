@@ -0,0 +1,106 @@
+import numpy as np
+from dataclasses import dataclass
+from scipy.special import ndtr
+
+
+'''
+    ------ BLACK-SCHOLES PRICING ------
+    Array-native European option pricing shared by OptionSimulator and MonteCarloSimulator.
+    1. Every argument may be a scalar or a NumPy array; shapes broadcast against each other
+    2. Expired points (time_to_expiration <= 0) are handled with masks and priced at intrinsic value
+    3. One call prices a whole (path, day) matrix, so nothing loops per simulated day
+    4. black_scholes_put_greeks returns the price and closed-form Greeks from the same d1/d2 pass
+'''
+
+_INV_SQRT_2PI = 1 / np.sqrt(2 * np.pi)
+
+
+@dataclass
+class PutGreeks:
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray    # Per 1.00 change in volatility (divide by 100 for one vol point)
+    theta: np.ndarray   # Per year (divide by 252 for one trading day)
+    rho: np.ndarray     # Per 1.00 change in the risk-free rate
+
+
+def _prepare(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility):
+    """Broadcast the inputs and compute d1/d2, with expired points given a placeholder time of 1 year."""
+    equity_price, put_strike, time_to_expiration, risk_free_rate, volatility = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (equity_price, put_strike, time_to_expiration, risk_free_rate, volatility)))
+
+    live = time_to_expiration > 0
+    safe_time = np.where(live, time_to_expiration, 1.0)  # keeps sqrt/log finite on expired points
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_t = np.sqrt(safe_time)
+        sigma_sqrt_t = volatility * sqrt_t
+        d1 = (np.log(equity_price / put_strike) + (risk_free_rate + 0.5 * volatility ** 2) * safe_time) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+    discounted_strike = put_strike * np.exp(-risk_free_rate * safe_time)
+    return equity_price, put_strike, safe_time, risk_free_rate, volatility, live, sqrt_t, d1, d2, discounted_strike
+
+
+def _scalar(x):
+    return x[()] if x.ndim == 0 else x
+
+
+def black_scholes_put(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility):
+    """
+    Calculate the price of a put option using the Black-Scholes model.
+
+    Parameters:
+    equity_price (float or array): Spot price of the underlying.
+    put_strike (float or array): Strike price of the put.
+    time_to_expiration (float or array): Time to expiration in years.
+    risk_free_rate (float or array): Annual risk-free rate.
+    volatility (float or array): Annual volatility.
+
+    Returns:
+    float or array: Put prices, broadcast to the common shape of the inputs.
+    """
+    equity_price, put_strike, _, _, _, live, _, d1, d2, discounted_strike = _prepare(
+        equity_price, put_strike, time_to_expiration, risk_free_rate, volatility)
+
+    put_price = discounted_strike * ndtr(-d2) - equity_price * ndtr(-d1)
+    put_price = np.where(live, put_price, np.maximum(put_strike - equity_price, 0.0))
+    return _scalar(put_price)
+
+
+def black_scholes_put_greeks(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility):
+    """
+    Price a put and compute its closed-form Greeks in one pass, reusing d1/d2, N(-d1), N(-d2) and pdf(d1).
+
+    Takes the same broadcastable arguments as black_scholes_put. Expired points get their intrinsic value,
+    a delta of -1 in the money (0 otherwise) and zero for the other Greeks.
+
+    Returns:
+    PutGreeks: price, delta, gamma, vega, theta and rho arrays of the common input shape.
+    """
+    equity_price, put_strike, safe_time, risk_free_rate, volatility, live, sqrt_t, d1, d2, discounted_strike = \
+        _prepare(equity_price, put_strike, time_to_expiration, risk_free_rate, volatility)
+
+    n_minus_d1 = ndtr(-d1)
+    n_minus_d2 = ndtr(-d2)
+    pdf_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 ** 2)
+    strike_term = discounted_strike * n_minus_d2
+
+    price = strike_term - equity_price * n_minus_d1
+    delta = -n_minus_d1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = pdf_d1 / (equity_price * volatility * sqrt_t)
+        theta = -equity_price * pdf_d1 * volatility / (2 * sqrt_t) + risk_free_rate * strike_term
+    vega = equity_price * pdf_d1 * sqrt_t
+    rho = -safe_time * strike_term
+
+    expired_delta = np.where(equity_price < put_strike, -1.0, 0.0)
+    return PutGreeks(
+        price=_scalar(np.where(live, price, np.maximum(put_strike - equity_price, 0.0))),
+        delta=_scalar(np.where(live, delta, expired_delta)),
+        gamma=_scalar(np.where(live, gamma, 0.0)),
+        vega=_scalar(np.where(live, vega, 0.0)),
+        theta=_scalar(np.where(live, theta, 0.0)),
+        rho=_scalar(np.where(live, rho, 0.0)),
+    )
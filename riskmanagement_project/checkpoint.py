@@ -0,0 +1,142 @@
+import json
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from monte_carlo import MonteCarloSimulator
+from parameters import Parameters
+
+
+'''
+    ------ SIMULATION CHECKPOINTS ------
+    Saves the state a Monte Carlo run needs to carry on, so a longer horizon does not re-simulate the prefix.
+    1. SimulationCheckpoint.from_results() keeps, per path, the last stock price, the roll day and current put
+       strike, plus the margin interest accumulated so far and the random-stream position of every block
+    2. extend(n_steps) simulates only the n_steps new days from those prices and values them with the puts
+       expiring at the lengthened horizon; it returns the new days and a checkpoint for the next extension
+    3. save() / load() keep a checkpoint in one .npz file
+
+    Random streams: the paths of block b are continued with the child SeedSequence number `segments` spawned
+    from block b's own SeedSequence, so every extension draws fresh, independent and reproducible numbers for
+    any worker count.
+
+    A run interrupted part way through is resumed at block level instead: see run(checkpoint_dir=...) in
+    MonteCarloSimulator.
+'''
+
+
+@dataclass
+class SimulationCheckpoint:
+    parameters: Parameters        # Parameters of the days simulated so far (time_horizon_step days)
+    entropy: int                  # Seed entropy of the run
+    block_sizes: list             # Paths per block, in block order
+    variance_reduction: str
+    segments: int                 # Continuation segments already drawn from every block's stream
+    terminal_prices: np.ndarray   # (n_paths,) stock price on the last simulated day
+    roll_days: np.ndarray         # (n_paths,) day the puts were rolled, -1 if never
+    put_strikes: np.ndarray       # (n_paths,) put strike held on the last simulated day
+    margin_interest: float        # Margin interest accumulated up to the last simulated day
+    option_style: str = 'european'
+
+    @property
+    def n_paths(self):
+        return self.terminal_prices.size
+
+    @classmethod
+    def from_results(cls, simulator, results):
+        """
+        Checkpoint the end state of simulator.run(n_paths). To extend again, chain the checkpoint extend()
+        returns: an extension's results cover only the new days and cannot be checkpointed here.
+        """
+        if results.stock_prices.shape[1] != simulator.parameters.time_horizon_step:
+            raise ValueError(f"Results span {results.stock_prices.shape[1]} days but the simulator's horizon is "
+                             f"{simulator.parameters.time_horizon_step}; checkpoint the results of "
+                             f"simulator.run(), or use the checkpoint extend() returned")
+        if simulator.path_generator is not None:
+            raise ValueError("Checkpoints continue the built-in GBM only, not a path_generator")
+        if simulator.volatility_surface is not None:
+            raise ValueError("Checkpoints price the puts at Parameters.volatility, not a volatility_surface")
+        return cls(
+            parameters=simulator.parameters,
+            entropy=simulator.seed_sequence.entropy,
+            block_sizes=results.block_sizes() or [size for _, size in simulator.block_seed_sequences(results.n_paths)],
+            variance_reduction=simulator.variance_reduction,
+            segments=0,
+            terminal_prices=results.stock_prices[:, -1].copy(),
+            roll_days=results.roll_days.copy(),
+            put_strikes=results.put_strike_prices[:, -1].copy(),
+            margin_interest=float(results.margin_interest[-1]),
+            option_style=simulator.option_style,
+        )
+
+    def extend(self, n_steps, greeks=False):
+        """
+        Continue every path for n_steps more days.
+
+        Parameters:
+        n_steps (int): Days to add; time_horizon and time_horizon_step both grow by n_steps.
+        greeks (bool): Also compute the position-level Greeks of the new days.
+
+        Returns:
+        tuple: (MonteCarloResults of the n_steps new days, SimulationCheckpoint after them).
+        """
+        parameters = replace(self.parameters, time_horizon=self.parameters.time_horizon + n_steps,
+                             time_horizon_step=self.parameters.time_horizon_step + n_steps)
+        parameters.stock_symbol = self.parameters.stock_symbol
+        simulator = MonteCarloSimulator(parameters, seed=self.entropy, variance_reduction=self.variance_reduction,
+                                        option_style=self.option_style)
+        segment = MonteCarloSimulator(replace(parameters, time_horizon_step=n_steps),
+                                      variance_reduction=self.variance_reduction)
+
+        children = np.random.SeedSequence(self.entropy).spawn(len(self.block_sizes))
+        brownian = np.concatenate([
+            segment.simulate_brownian_paths(size, np.random.default_rng(child.spawn(self.segments + 1)[-1]))
+            for child, size in zip(children, self.block_sizes)])
+
+        # GBM continued from the last prices, with the drift applied per elapsed day of the segment
+        elapsed = simulator.adjusted_time_step * np.arange(1, n_steps + 1)
+        prices = brownian
+        prices *= parameters.volatility
+        prices += (parameters.annual_expected_return - 0.5 * parameters.volatility ** 2) * elapsed
+        np.exp(prices, out=prices)
+        prices *= self.terminal_prices[:, np.newaxis]
+
+        results = simulator.value_hedged_position(prices, greeks, first_day=self.parameters.time_horizon_step,
+                                                  prior_roll_days=self.roll_days)
+        checkpoint = replace(
+            self,
+            parameters=parameters,
+            segments=self.segments + 1,
+            terminal_prices=prices[:, -1].copy(),
+            roll_days=results.roll_days,
+            put_strikes=results.put_strike_prices[:, -1].copy(),
+            margin_interest=self.margin_interest + simulator.borrowed_amount * simulator.daily_margin_rate * n_steps,
+        )
+        return results, checkpoint
+
+    def save(self, path):
+        """Write the checkpoint to one .npz file."""
+        meta = {
+            'parameters': self.parameters.to_dict(),
+            'stock_symbol': self.parameters.stock_symbol,
+            'entropy': str(self.entropy),  # May exceed 64 bits when drawn from the OS
+            'block_sizes': [int(size) for size in self.block_sizes],
+            'variance_reduction': self.variance_reduction,
+            'segments': self.segments,
+            'margin_interest': self.margin_interest,
+            'option_style': self.option_style,
+        }
+        np.savez(path, meta=np.array(json.dumps(meta)), terminal_prices=self.terminal_prices,
+                 roll_days=self.roll_days, put_strikes=self.put_strikes)
+
+    @classmethod
+    def load(cls, path):
+        """Read a checkpoint written by save()."""
+        with np.load(path, allow_pickle=False) as saved:
+            meta = json.loads(str(saved['meta']))
+            arrays = {name: saved[name] for name in ('terminal_prices', 'roll_days', 'put_strikes')}
+        parameters = Parameters.from_dict({**meta['parameters'], 'stock_symbol': meta['stock_symbol']})
+        return cls(parameters=parameters, entropy=int(meta['entropy']), block_sizes=meta['block_sizes'],
+                   variance_reduction=meta['variance_reduction'], segments=meta['segments'],
+                   margin_interest=meta['margin_interest'], option_style=meta.get('option_style', 'european'),
+                   **arrays)
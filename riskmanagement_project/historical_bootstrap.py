@@ -0,0 +1,111 @@
+import hashlib
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from path_generators import PathGenerator
+
+
+'''
+    ------ HISTORICAL BLOCK BOOTSTRAP ------
+    Path generator that resamples real daily returns instead of drawing normal ones, so simulated paths keep the
+    fat tails and short-range volatility clustering of the cached price history.
+    1. load_price_history() reads the closing prices saved by stock_data.py to STOCK_RESULTS
+       (<ticker>_historical_data.csv, or <ticker>_ticker_data.csv with its extra ticker header row)
+    2. The daily log returns are kept once, in a single shared vector
+    3. Each path is an (int32) array of indices into that vector, built from blocks of consecutive days:
+       'stationary' blocks have geometric lengths (Politis-Romano), 'fixed' blocks all last mean_block_length days.
+       Prices are only materialised at the end, as S0 * exp(cumsum(returns[indices]))
+
+    By default the returns are re-centred so the drift follows Parameters.annual_expected_return and only the
+    shape of the historical shocks is kept (recenter=False keeps the historical drift). The puts are still priced
+    at Parameters.volatility.
+
+    Use it like any other generator:
+        OptionSimulator(parameters, path_generator=BlockBootstrapGenerator.from_history('AAPL'))
+'''
+
+PRICE_COLUMNS = ('Adj Close', 'Close')
+
+
+def load_price_history(ticker, directory="STOCK_RESULTS"):
+    """Closing prices of a ticker from the CSV files stock_data.py saves, oldest first."""
+    for description in ('historical_data', 'ticker_data'):
+        csv_filename = os.path.join(directory, f"{ticker}_{description}.csv")
+        if not os.path.exists(csv_filename):
+            continue
+        data = pd.read_csv(csv_filename)
+        column = next((name for name in PRICE_COLUMNS if name in data.columns), None)
+        if column is None:
+            continue
+        # ticker_data files carry a second header row with the ticker name; coercion drops it
+        prices = pd.to_numeric(data[column], errors='coerce').dropna()
+        return prices[prices > 0].to_numpy(dtype=float)
+    raise FileNotFoundError(f"No price history for '{ticker}' in {directory} "
+                            f"(expected {ticker}_historical_data.csv or {ticker}_ticker_data.csv)")
+
+
+@dataclass
+class BlockBootstrapGenerator(PathGenerator):
+    returns: np.ndarray              # Daily log returns, shared by every path
+    mean_block_length: float = 10.0  # Expected block length in days (exact length for method='fixed')
+    method: str = 'stationary'       # 'stationary' (geometric block lengths) or 'fixed'
+    recenter: bool = True            # Replace the historical drift with Parameters.annual_expected_return
+    source: str = 'custom'           # Where the returns came from, for descriptions and cache keys
+    name = 'bootstrap'
+
+    def __post_init__(self):
+        if self.method not in ('stationary', 'fixed'):
+            raise ValueError(f"Unknown bootstrap method '{self.method}' (use 'stationary' or 'fixed')")
+        self.returns = np.asarray(self.returns, dtype=float)
+        if self.returns.size < 2:
+            raise ValueError("At least two historical returns are needed for a bootstrap")
+
+    @classmethod
+    def from_history(cls, ticker, directory="STOCK_RESULTS", **kwargs):
+        """Build the generator from the cached price history of a ticker."""
+        prices = load_price_history(ticker, directory)
+        return cls(returns=np.diff(np.log(prices)), source=ticker, **kwargs)
+
+    def describe(self):
+        return {'model': self.name, 'source': self.source, 'n_returns': int(self.returns.size),
+                'returns_sha256': hashlib.sha256(self.returns.tobytes()).hexdigest(),
+                'mean_block_length': self.mean_block_length, 'method': self.method, 'recenter': self.recenter}
+
+    def index_paths(self, n_paths, steps, rng):
+        """(n_paths x steps) int32 indices into self.returns, laid out as bootstrap blocks (circular wrap)."""
+        n_returns = self.returns.size
+        positions = np.arange(steps, dtype=np.int32)
+        if self.method == 'fixed':
+            new_block = np.zeros((n_paths, steps), dtype=bool)
+            new_block[:, ::max(1, int(round(self.mean_block_length)))] = True
+        else:
+            new_block = rng.random((n_paths, steps)) < 1 / self.mean_block_length
+            new_block[:, 0] = True
+
+        # Position where the current block started, then the random start index of that block
+        block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+        indices = np.zeros((n_paths, steps), dtype=np.int32)
+        indices[new_block] = rng.integers(0, n_returns, size=np.count_nonzero(new_block))
+        indices = np.take_along_axis(indices, block_start, axis=1)
+        indices += positions - block_start
+        indices %= n_returns
+        return indices
+
+    def daily_returns(self, parameters):
+        """The shared return vector, re-centred on the Parameters drift when recenter=True."""
+        if not self.recenter:
+            return self.returns
+        dt = 1 / parameters.time_step
+        target = (parameters.annual_expected_return - 0.5 * self.returns.var() / dt) * dt
+        return self.returns - self.returns.mean() + target
+
+    def simulate(self, parameters, n_paths, rng):
+        returns = self.daily_returns(parameters)
+        prices = returns[self.index_paths(n_paths, parameters.time_horizon_step, rng)]
+        np.cumsum(prices, axis=1, out=prices)
+        np.exp(prices, out=prices)
+        prices *= parameters.initial_equity_price
+        return prices
@@ -0,0 +1,128 @@
+import logging
+
+import numpy as np
+from scipy.optimize import brentq
+
+from black_scholes import black_scholes_put, black_scholes_put_greeks, _scalar
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    ------ IMPLIED VOLATILITY ------
+    Batch inversion of Black-Scholes prices, so Parameters.volatility can come from market quotes.
+    1. Calls are turned into puts by put-call parity, so one put solver covers both option types
+    2. Quotes outside the no-arbitrage bounds (or expired) get NaN instead of a meaningless volatility
+    3. Safeguarded Newton on every quote at once: each quote keeps a [low, high] bracket that shrinks with the
+       sign of its pricing error, and a Newton step that leaves the bracket (or a vanishing vega) falls back to
+       bisection. Starting from the Manaster-Koehler point, the price's inflection in volatility, Newton
+       converges monotonically for almost every quote
+    4. The few quotes still unconverged after max_iterations are solved one by one with Brent's method on
+       their final bracket
+
+    add_implied_volatility() writes the result back as an 'Implied Volatility' column of a yfinance option chain.
+'''
+
+MIN_VOLATILITY = 1e-4
+MAX_VOLATILITY = 5.0
+NEWTON_ITERATIONS = 20
+PRICE_TOLERANCE = 1e-8
+MIN_VEGA = 1e-10
+
+
+def implied_volatility(option_price, equity_price, strike, time_to_expiration, risk_free_rate, option_type='put',
+                       tolerance=PRICE_TOLERANCE, max_iterations=NEWTON_ITERATIONS):
+    """
+    Implied Black-Scholes volatility of European option quotes, vectorized across quotes.
+
+    Parameters:
+    option_price (float or array): Quoted option prices.
+    equity_price, strike, time_to_expiration, risk_free_rate: As in black_scholes_put (broadcastable).
+    option_type (str or array): 'put' or 'call' (per quote if an array).
+    tolerance (float): Absolute pricing error at which a quote counts as solved.
+    max_iterations (int): Newton iterations before the Brent fallback.
+
+    Returns:
+    float or array: Annual implied volatilities; NaN where the quote violates the no-arbitrage bounds,
+                    has expired or needs a volatility outside [MIN_VOLATILITY, MAX_VOLATILITY].
+    """
+    is_call = np.char.startswith(np.char.lower(np.asarray(option_type, dtype=str)), 'call')
+    price, spot, strike, time, rate, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (option_price, equity_price, strike, time_to_expiration,
+                                                risk_free_rate)), is_call)
+    discounted_strike = strike * np.exp(-rate * np.where(time > 0, time, 0.0))
+    put_price = np.where(is_call, price - spot + discounted_strike, price)  # Put-call parity
+
+    sigma = np.full(price.shape, np.nan)
+    valid = (time > 0) & np.isfinite(put_price) & (spot > 0) & (strike > 0) \
+        & (put_price > np.maximum(discounted_strike - spot, 0.0)) & (put_price < discounted_strike)
+    if not valid.any():
+        return _scalar(sigma)
+
+    target, spot, strike, time, rate = (x[valid] for x in (put_price, spot, strike, time, rate))
+    low = np.full(target.shape, MIN_VOLATILITY)
+    high = np.full(target.shape, MAX_VOLATILITY)
+    # Quotes that no volatility in the search range can reproduce stay NaN
+    reachable = (black_scholes_put(spot, strike, time, rate, low) <= target) \
+        & (black_scholes_put(spot, strike, time, rate, high) >= target)
+
+    # Manaster-Koehler starting point
+    guess = np.sqrt(2 * np.abs(np.log(spot / strike) + rate * time) / time)
+    guess = np.clip(guess, 0.1, MAX_VOLATILITY / 2)
+    solved = ~reachable
+
+    for _ in range(max_iterations):
+        active = np.flatnonzero(~solved)
+        if active.size == 0:
+            break
+        greeks = black_scholes_put_greeks(spot[active], strike[active], time[active], rate[active], guess[active])
+        error = np.atleast_1d(greeks.price) - target[active]
+        vega = np.atleast_1d(greeks.vega)
+        converged = np.abs(error) < tolerance
+        solved[active] = converged
+
+        # Put prices increase with volatility, so the sign of the error says which side of the root we are on
+        high[active] = np.where(error > 0, guess[active], high[active])
+        low[active] = np.where(error <= 0, guess[active], low[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = guess[active] - error / vega
+        inside = (vega > MIN_VEGA) & (step > low[active]) & (step < high[active])
+        guess[active] = np.where(converged, guess[active],
+                                 np.where(inside, step, 0.5 * (low[active] + high[active])))
+
+    unsolved = np.flatnonzero(~solved)
+    if unsolved.size:
+        logger.debug(f"[!] Brent fallback for {unsolved.size} of {target.size} quotes")
+    for i in unsolved:
+        guess[i] = brentq(lambda s: black_scholes_put(spot[i], strike[i], time[i], rate[i], s) - target[i],
+                          low[i], high[i], xtol=1e-12)
+
+    sigma[valid] = np.where(reachable, guess, np.nan)
+    return _scalar(sigma)
+
+
+def quote_prices(chain):
+    """Mid of bid and ask where both are quoted, otherwise the last traded price."""
+    mid = 0.5 * (chain['bid'] + chain['ask'])
+    return mid.where((chain['bid'] > 0) & (chain['ask'] > 0), chain['lastPrice'])
+
+
+def add_implied_volatility(chain, equity_price, time_to_expiration, risk_free_rate, option_type):
+    """
+    Solve the implied volatility of every contract in a yfinance option chain (calls or puts).
+
+    Parameters:
+    chain (DataFrame): option_chain(...).calls or .puts, with strike, bid, ask and lastPrice columns.
+    equity_price (float): Current price of the underlying.
+    time_to_expiration (float): Years to the chain's expiration date.
+    risk_free_rate (float): Annual risk-free rate.
+    option_type (str): 'call' or 'put'.
+
+    Returns:
+    DataFrame: A copy of the chain with an 'Implied Volatility' column (NaN for unusable quotes).
+    """
+    chain = chain.copy()
+    chain['Implied Volatility'] = implied_volatility(quote_prices(chain).to_numpy(dtype=float), equity_price,
+                                                     chain['strike'].to_numpy(dtype=float), time_to_expiration,
+                                                     risk_free_rate, option_type)
+    return chain
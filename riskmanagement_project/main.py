@@ -1,7 +1,6 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.stats import norm
 from prettytable import PrettyTable
 import os
 import time
@@ -12,12 +11,11 @@ import yfinance as yf
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.stats import norm
 from tabulate import tabulate
 from prettytable import PrettyTable
-from dataclasses import dataclass
 import openpyxl as px
 import datetime as dt
+import logging
 
 #from datetime import time, datetime, timedelta
 #from matplotlib import DateFormatter
@@ -29,6 +27,11 @@ import matplotlib.dates as mdates
 from stock_data import StockData
 from stock_data import FinancialDataDownloader
 from stock_data import StockVisualizer
+from monte_carlo import MonteCarloSimulator
+from margin import DEFAULT_MAINTENANCE_MARGIN, check_margin
+from black_scholes import black_scholes_put
+from parameters import Parameters
+from result_cache import ResultCache
 #from simple_regression_scratch import StockPredictor
 #from simple_regression_scratch import SimpleLinearRegressor
 
@@ -40,47 +43,16 @@ from stock_data import StockVisualizer
 
 # OptionData = option_data.OptionData
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class Parameters():
-    stock_symbol = None
-    initial_equity_price: float
-    strike_price_PUT: float
-    trigger_price_PUT: float
-    time_horizon: int
-    time_step: int
-    time_horizon_step: int
-    annual_expected_return: float
-    volatility: float
-    risk_free_rate: float
-    trigger_price: float
-    num_shares: int
-    num_puts: int
-    margin_requirement: float
-    margin_rate: float
-
-    @classmethod
-    def from_user_input(cls):
-        """Create an instance by taking inputs from the user."""
-        print("[!] Enter the following parameters:")
-        return cls(
-            initial_equity_price=float(input(" [?] Initial Equity Price (e.g., 40.0): ")),
-            strike_price_PUT=float(input("[?] Strike Price for PUT (e.g., 35.0): ")),
-            trigger_price_PUT=float(input("[?] Trigger Price for PUT (e.g., 40.0): ")),
-            time_horizon=int(input("[?] Time Horizon (Days, e.g., 90): ")),
-            time_step=252,  # Set to 252 (trading days in a year)
-            time_horizon_step=int(input("[?] Time Horizon Step (e.g., 90): ")),
-            annual_expected_return=float(input("[?] Annual Expected Return (e.g., 0.05 for 5%): ")),
-            volatility=float(input("[?] Volatility (e.g., 0.3 for 30%): ")),
-            risk_free_rate=float(input("[?] Risk-Free Rate (e.g., 0.01 for 1%): ")),
-            trigger_price=float(input("[?] Trigger Price (e.g., 42.5): ")),
-            num_shares=int(input("[?] Number of Shares (e.g., 1000): ")),
-            num_puts=int(input("[?] Number of Put Contracts (e.g., 10): ")),
-            margin_requirement=float(input("[?] Margin Requirement (e.g., 0.5 for 50%): ")),
-            margin_rate=float(input("[?] Margin Rate (e.g., 0.05 for 5%): ")),
-        )
+LOG_FORMAT = '%(message)s'
+HEADLESS_LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
 
 
+def configure_logging(level=logging.INFO, headless=False):
+    """Send simulator output through logging: bare messages interactively, timestamped records when headless."""
+    logging.basicConfig(level=level, format=HEADLESS_LOG_FORMAT if headless else LOG_FORMAT)
+
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -442,21 +414,48 @@ class StockPredictorPolynomial(StockData):
             print("Data fetching failed. Exiting.")
 
 class OptionSimulator:
-    def __init__(self, parameters):
+    def __init__(self, parameters, n_paths=None, headless=False, seed=42, max_workers=1, streaming=False,
+                 variance_reduction='plain', cache=False, path_generator=None, option_style='european',
+                 volatility_surface=None, maintenance_margin=DEFAULT_MAINTENANCE_MARGIN, target_std_error=None,
+                 target_statistic='mean'):
         self.parameters = parameters
+        self.n_paths = n_paths  # None runs the original single-path simulation
+        self.target_std_error = target_std_error  # Stop adding paths once reached; n_paths is then the maximum
+        self.target_statistic = target_statistic  # Statistic the target applies to: 'mean' or 'var'
+        self.streaming = streaming  # Multi-path mode keeps only online statistics (constant memory)
+        self.variance_reduction = variance_reduction  # Multi-path draws: 'plain', 'antithetic' or 'sobol'
+        self.cache = cache  # Opt-in: reuse identical in-memory multi-path runs from BLACK_SCHOLES_RESULTS/cache
+        self.path_generator = path_generator  # A path_generators.PathGenerator (Heston, Merton, ...); None = GBM
+        self.option_style = option_style  # 'european' (Black-Scholes) or 'american' (binomial lattice) puts
+        self.volatility_surface = volatility_surface  # Smile for the put prices (volatility_surface.py); None = flat
+        self.maintenance_margin = maintenance_margin  # Minimum equity / share value before a margin call
+        self.headless = headless  # No sleeps, no blocking plt.show(), no console tables
+        self.max_workers = max_workers  # Processes for the multi-path mode, None uses every CPU
+        self.seed_sequence = np.random.SeedSequence(seed)  # seed=None varies across runs
+        self.rng = np.random.default_rng(self.seed_sequence)
         self.adjusted_time_step = 1 / self.parameters.time_step  # Time step in years (assuming 252 trading days per year)
         self.borrowed_amount = self.parameters.num_shares * self.parameters.initial_equity_price * (
                 1 - self.parameters.margin_requirement)
         self.daily_margin_rate = self.parameters.margin_rate / self.parameters.time_step
         self.total_margin_interest = 0
 
-        self.run_simulation = self.run_simulation()
+        if self.headless:
+            plt.switch_backend('Agg')
+        if seed is None:
+            logger.info(f"[!] Random seed entropy (pass as seed to reproduce): {self.seed_sequence.entropy}")
+
+        if self.n_paths is None:
+            self.run_simulation = self.run_simulation()
+        else:
+            self.monte_carlo_results = self.run_monte_carlo(self.n_paths)
 
 
     def simulate_stock_prices(self):
-        """Simulate stock prices using geometric Brownian motion."""
+        """Simulate stock prices using geometric Brownian motion, or the path_generator when one is set."""
+        if self.path_generator is not None:
+            return self.path_generator.simulate(self.parameters, 1, self.rng)[0]
         t = np.linspace(0, self.parameters.time_horizon * self.adjusted_time_step, self.parameters.time_horizon_step)
-        randomness = np.random.standard_normal(size=self.parameters.time_horizon_step)
+        randomness = self.rng.standard_normal(size=self.parameters.time_horizon_step)
         randomness = np.cumsum(randomness) * np.sqrt(self.adjusted_time_step)
         coeff = (self.parameters.annual_expected_return - 0.5 * self.parameters.volatility ** 2) * t \
                 + self.parameters.volatility * randomness
@@ -464,16 +463,9 @@ class OptionSimulator:
         return new_stock_price
 
     def black_scholes_put(self, equity_price, put_strike, time_to_expiration):
-        """Calculate the price of a put option using the Black-Scholes model."""
-        if time_to_expiration <= 0:
-            return max(put_strike - equity_price, 0)
-        d1 = (np.log(equity_price / put_strike) + (
-                self.parameters.risk_free_rate + 0.5 * self.parameters.volatility ** 2) * time_to_expiration) / (
-                     self.parameters.volatility * np.sqrt(time_to_expiration))
-        d2 = d1 - self.parameters.volatility * np.sqrt(time_to_expiration)
-        put_price = put_strike * np.exp(-self.parameters.risk_free_rate * time_to_expiration) * norm.cdf(-d2) \
-                    - equity_price * norm.cdf(-d1)
-        return put_price
+        """Calculate the price of a put option using the Black-Scholes model (scalars or arrays)."""
+        return black_scholes_put(equity_price, put_strike, time_to_expiration,
+                                 self.parameters.risk_free_rate, self.parameters.volatility)
 
     def plot_stock_prices(self, prices):
         """Plot the simulated stock prices over time."""
@@ -494,29 +486,28 @@ class OptionSimulator:
         plt.legend()
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
 
         description = 'simulated_stock_prices'
         output_file = f"{description}.png"
         plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f'[!] Graph saved to {output_file}')
+        logger.info(f'[!] Graph saved to {output_file}')
+        self.show_plot()
+
+    def pause(self, seconds):
+        """Pace the console output of interactive runs; headless runs never sleep."""
+        if not self.headless:
+            time.sleep(seconds)
+
+    def show_plot(self):
+        """Show the current figure interactively, or close it in headless mode to free its memory."""
+        if self.headless:
+            plt.close()
+        else:
+            plt.show()
 
     def run_simulation(self):
         """Run the main simulation logic."""
-        # Initialize variables
-        position_values = []
-        put_strike_prices = []
-        put_option_values = []
-        actions = []
-        margin_interests = []
-
-        borrowed_amount = self.parameters.num_shares * self.parameters.initial_equity_price * (
-                1 - self.parameters.margin_requirement)
-        daily_margin_rate = self.parameters.margin_rate / self.parameters.time_step
-        total_margin_interest = 0
-
         # Step 1: Simulate Prices
-        np.random.seed(42)
         simulated_price_index = self.simulate_stock_prices()
 
         # Prepare pandas DataFrame
@@ -528,82 +519,74 @@ class OptionSimulator:
         os.makedirs("BLACK_SCHOLES_RESULTS", exist_ok=True)
         csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", f"{description}.csv")
         df.to_csv(csv_filename, index=False)
-        print(f"\n[!] Data saved to {csv_filename}\n")
+        logger.info(f"\n[!] Data saved to {csv_filename}\n")
 
         # Plot stock prices
         self.plot_stock_prices(simulated_price_index)
 
-        # Initial put option
-        T_initial = self.parameters.time_horizon * self.adjusted_time_step
-        put_price = self.black_scholes_put(
-            self.parameters.initial_equity_price,
-            self.parameters.strike_price_PUT,
-            T_initial
-        )
-        put_option_value = self.parameters.num_puts * 100 * put_price
-        current_put_strike = self.parameters.strike_price_PUT
-        action = f'Bought initial puts at {self.parameters.strike_price_PUT}'
-        actions.append(action)
-
-        # Main simulation loop
-        for day in range(self.parameters.time_horizon_step):
-            day_stock = df['Stock Price'].iloc[day]
-            adjusted_time_to_expiration = (self.parameters.time_horizon - day) * self.adjusted_time_step
-            interest = borrowed_amount * daily_margin_rate
-            total_margin_interest += interest
-
-            # Check for trigger to adjust puts
-            if day_stock >= self.parameters.trigger_price and current_put_strike == self.parameters.strike_price_PUT:
-                print("\n[!] Trigger price reached. Adjusting put options...")
-                print("... Selling puts and buying new puts with higher strike price")
-                time.sleep(0.1)
-
-                put_price_sell = self.black_scholes_put(day_stock, self.parameters.strike_price_PUT,
-                                                        adjusted_time_to_expiration)
-                proceeds = self.parameters.num_puts * 100 * put_price_sell
-                print(f"\n[+] Sold puts at ${self.parameters.strike_price_PUT} for ${proceeds:.2f}")
-                time.sleep(0.25)
-
-                # Buy new puts with higher strike price
-                current_put_strike = self.parameters.trigger_price_PUT
-                remaining_days = self.parameters.time_horizon - day
-                T_new = remaining_days * self.adjusted_time_step
-                put_price_buy = self.black_scholes_put(day_stock, self.parameters.trigger_price_PUT, T_new)
-                put_option_value = self.parameters.num_puts * 100 * put_price_buy
-
-                print(f".. Bought puts at K=${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}")
-                time.sleep(0.25)
-
-                print(
-                    f"\n[RESULTS] \n[+] Day {day} Bought puts at ${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}")
-
-                action = (
-                    f' [+] DAY: {day} Bought puts at K=${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}, '
-                    f'[PRICE ACTION] Sold puts at ${self.parameters.strike_price_PUT}, bought puts at ${self.parameters.trigger_price_PUT}')
-                print("[+] Price Action: ", action)
-            else:
-                # Update put option value
-                put_price_current = self.black_scholes_put(day_stock, current_put_strike, adjusted_time_to_expiration)
-                put_option_value = self.parameters.num_puts * 100 * put_price_current
-                action = '[!] No need for action today'
-                print("[+]\n Price Action: ", action)
-
-            # Total position value
-            position_value = (self.parameters.num_shares * day_stock) + put_option_value - total_margin_interest
-
-            # Store results
-            position_values.append(position_value)
-            put_strike_prices.append(current_put_strike)
-            put_option_values.append(put_option_value)
-            actions.append(action)
-            margin_interests.append(total_margin_interest)
+        # Step 2: Value the whole run with array operations (trigger crossing, strike schedule, cumulative interest)
+        valuation = MonteCarloSimulator(self.parameters, option_style=self.option_style,
+                                        volatility_surface=self.volatility_surface)
+        results = valuation.value_hedged_position(simulated_price_index[np.newaxis, :], greeks=True)
+        position_values = results.position_values[0]
+        put_strike_prices = results.put_strike_prices[0]
+        put_option_values = results.put_option_values[0]
+        margin_interests = results.margin_interest
+        roll_day = results.roll_days[0]
+
+        actions = ['[!] No need for action today'] * self.parameters.time_horizon_step
+        if roll_day >= 0:
+            day_stock = simulated_price_index[roll_day]
+            adjusted_time_to_expiration = (self.parameters.time_horizon - roll_day) * self.adjusted_time_step
+
+            logger.info("\n[!] Trigger price reached. Adjusting put options...")
+            logger.info("... Selling puts and buying new puts with higher strike price")
+            self.pause(0.1)
+
+            put_price_sell = valuation.price_puts(day_stock, self.parameters.strike_price_PUT,
+                                                  adjusted_time_to_expiration)
+            proceeds = self.parameters.num_puts * 100 * put_price_sell
+            logger.info(f"\n[+] Sold puts at ${self.parameters.strike_price_PUT} for ${proceeds:.2f}")
+            self.pause(0.25)
+
+            put_option_value = put_option_values[roll_day]
+            logger.info(f".. Bought puts at K=${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}")
+            self.pause(0.25)
+
+            logger.info(
+                f"\n[RESULTS] \n[+] Day {roll_day} Bought puts at ${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}")
+
+            actions[roll_day] = (
+                f' [+] DAY: {roll_day} Bought puts at K=${self.parameters.trigger_price_PUT} for ${put_option_value:.2f}, '
+                f'[PRICE ACTION] Sold puts at ${self.parameters.strike_price_PUT}, bought puts at ${self.parameters.trigger_price_PUT}')
+
+        margin = check_margin(results, self.parameters, self.maintenance_margin)
+        if margin.called[0]:
+            call_day = margin.call_days[0]
+            logger.info(f"\n[-] Margin call on day {call_day}: equity below {100 * self.maintenance_margin:.0f}% "
+                        f"of the shares, position liquidated for ${margin.liquidation_values[0]:,.2f}")
+            actions[call_day] = f' [-] DAY: {call_day} Margin call, shares and puts sold'
+            # Nothing is held after the forced sale: the value stays at the liquidation value and the loan,
+            # its interest and the hedge stop with it
+            after_call = np.arange(self.parameters.time_horizon_step) > call_day
+            for day in np.flatnonzero(after_call):
+                actions[day] = '[!] Position liquidated, nothing held'
+            position_values = margin.position_values[0]
+            put_option_values = np.where(after_call, 0.0, put_option_values)
+            margin_interests = np.where(after_call, margin_interests[call_day], margin_interests)
+            results.position_greeks['delta'][0, after_call] = 0.0
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for day, action in enumerate(actions):
+                logger.debug(f"[+] Day {day} Price Action: {action}")
 
         # Add results to DataFrame
         df['Put Strike Price'] = put_strike_prices
         df['Put Option Value'] = put_option_values
         df['Margin Interest'] = margin_interests
         df['Total Position Value'] = position_values
-        df['Action'] = actions[1:]  # Skip the initial action
+        df['Position Delta'] = results.position_greeks['delta'][0]
+        df['Action'] = actions
         df['Date'] = pd.to_datetime(df['Date']).dt.date
         df['Value'] = df['Total Position Value'].map('${:,.2f}'.format)
 
@@ -615,17 +598,17 @@ class OptionSimulator:
 
             excel_filename = os.path.join("BLACK_SCHOLES_RESULTS", f"{description}.xlsx")
             df.to_excel(excel_filename, index=False, engine='openpyxl')
-            print(f"[!] Data saved to {csv_filename} and {excel_filename}")
+            logger.info(f"[!] Data saved to {csv_filename} and {excel_filename}")
         except Exception as e:
-            print(f"[-] Error saving data: {e}")
+            logger.error(f"[-] Error saving data: {e}")
             pass
 
-        # Display the final table
-        put_table = PrettyTable()
-        put_table.field_names = df.columns.tolist()
-        for row in df.itertuples(index=False):
-            put_table.add_row(row)
-        print(put_table)
+        # Display the final table (skipped in headless mode, the CSV holds the same data)
+        if not self.headless:
+            put_table = PrettyTable()
+            put_table.field_names = df.columns.tolist()
+            put_table.add_rows(list(df.itertuples(index=False)))
+            logger.info(put_table)
 
         # Plot total position value over time
         plt.figure(figsize=(12, 6))
@@ -639,11 +622,11 @@ class OptionSimulator:
 
         output_file = 'total_position_value.png'
         plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f'[!] Graph saved to {output_file}')
-        plt.show()
+        logger.info(f'[!] Graph saved to {output_file}')
+        self.show_plot()
 
         # Plot stock price and put strike price over time
-        print("Plotting the stock price and put strike price over time")
+        logger.info("Plotting the stock price and put strike price over time")
         plt.figure(figsize=(12, 6))
         plt.plot(df['Date'], df['Stock Price'], label='Stock Price')
         plt.plot(df['Date'], df['Put Strike Price'], label='Put Strike Price', linestyle='--')
@@ -656,16 +639,119 @@ class OptionSimulator:
 
         output_file = 'stock_and_put_strike_price.png'
         plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f'[!] Graph saved to {output_file}')
-        plt.show()
+        logger.info(f'[!] Graph saved to {output_file}')
+        self.show_plot()
 
         return simulated_price_index
 
+    def run_monte_carlo(self, n_paths):
+        """Run the hedged-position valuation across n_paths simulated price paths at once."""
+        start = time.perf_counter()
+        monte_carlo = MonteCarloSimulator(self.parameters, seed=self.seed_sequence.entropy,
+                                          variance_reduction=self.variance_reduction,
+                                          path_generator=self.path_generator, option_style=self.option_style,
+                                          volatility_surface=self.volatility_surface)
+        if self.target_std_error is not None:
+            sequential = monte_carlo.run_sequential(self.target_std_error, self.target_statistic, max_paths=n_paths,
+                                                    max_workers=self.max_workers, streaming=self.streaming)
+            results = sequential.results
+            if sequential.converged:
+                logger.info(f"[+] {sequential.n_paths:,} paths needed for a {self.target_statistic} std error of "
+                            f"{sequential.std_error:,.2f} (target {self.target_std_error:,})")
+            else:
+                logger.warning(f"[-] Std error {sequential.std_error:,.2f} still above the target "
+                               f"{self.target_std_error:,} after the maximum of {n_paths:,} paths")
+            os.makedirs("BLACK_SCHOLES_RESULTS", exist_ok=True)
+            csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", "sequential_convergence.csv")
+            sequential.history.to_csv(csv_filename, index=False)
+            logger.info(f"[!] Data saved to {csv_filename}")
+            n_paths = sequential.n_paths
+        elif self.streaming:
+            results = monte_carlo.run_streaming(n_paths, max_workers=self.max_workers)
+        else:
+            results = monte_carlo.run(n_paths, max_workers=self.max_workers,
+                                      cache=ResultCache() if self.cache else None)
+        elapsed = time.perf_counter() - start
+        logger.info(f"\n[!] Simulated {n_paths:,} paths x {self.parameters.time_horizon_step} steps in {elapsed:.2f}s")
+
+        # Save the distribution summary of the terminal position value
+        summary = results.summary()
+        os.makedirs("BLACK_SCHOLES_RESULTS", exist_ok=True)
+        csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", "monte_carlo_summary.csv")
+        summary.to_csv(csv_filename, index=False)
+        logger.info(f"[!] Data saved to {csv_filename}")
+
+        if not self.headless:
+            summary_table = PrettyTable()
+            summary_table.field_names = summary.columns.tolist()
+            for statistic, value in summary.itertuples(index=False):
+                summary_table.add_row([statistic, f'{value:,.2f}'])
+            logger.info(summary_table)
+
+        if not self.streaming:
+            estimate = monte_carlo.estimate_terminal_value(results)
+            logger.info(f"[!] Expected terminal position value ({estimate['Method']}): "
+                        f"${estimate['Estimate']:,.2f} +/- {estimate['Std Error']:,.2f}")
+
+            # Maintenance-margin check on every path and day
+            margin = check_margin(results, self.parameters, self.maintenance_margin)
+            csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", "margin_summary.csv")
+            margin.summary().to_csv(csv_filename, index=False)
+            logger.info(f"[!] Margin calls on {100 * margin.call_fraction:.2f}% of paths "
+                        f"(maintenance {100 * self.maintenance_margin:.0f}%), data saved to {csv_filename}")
+
+            # VaR / ES of the hedged position with bootstrap confidence intervals
+            report = monte_carlo.risk_report(results)
+            csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", "risk_report.csv")
+            report.to_csv(csv_filename, index=False)
+            logger.info(f"[!] Data saved to {csv_filename}")
+            if not self.headless:
+                report_table = PrettyTable()
+                report_table.field_names = report.columns.tolist()
+                report_table.add_rows(list(report.round(2).itertuples(index=False)))
+                logger.info(report_table)
+
+        if self.streaming:
+            # Only the terminal value histogram is kept in streaming mode
+            histogram = results.terminal_histogram.to_frame(n_bins=100)
+            csv_filename = os.path.join("BLACK_SCHOLES_RESULTS", "monte_carlo_terminal_histogram.csv")
+            histogram.to_csv(csv_filename, index=False)
+            logger.info(f"[!] Data saved to {csv_filename}")
+
+            plt.figure(figsize=(12, 6))
+            plt.bar(histogram['Bin Start'], histogram['Count'], width=histogram['Bin End'] - histogram['Bin Start'],
+                    align='edge', label='Paths')
+            plt.title(f"Terminal Total Position Value Across {n_paths:,} Paths")
+            plt.xlabel('Value ($)')
+            plt.ylabel('Paths')
+        else:
+            # Plot the percentile bands of the total position value over time
+            dates = pd.date_range(start='2023-01-01', periods=self.parameters.time_horizon_step, freq='B')
+            bands = np.percentile(results.position_values, [5, 25, 50, 75, 95], axis=0)
+            plt.figure(figsize=(12, 6))
+            plt.fill_between(dates, bands[0], bands[4], alpha=0.2, label='5th - 95th Percentile')
+            plt.fill_between(dates, bands[1], bands[3], alpha=0.4, label='25th - 75th Percentile')
+            plt.plot(dates, bands[2], label='Median')
+            plt.title(f"Total Position Value Across {n_paths:,} Paths Over {self.parameters.time_horizon} Days")
+            plt.xlabel('Date')
+            plt.ylabel('Value ($)')
+        plt.legend()
+        plt.grid(True)
+        plt.tight_layout()
+
+        output_file = 'monte_carlo_position_value.png'
+        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        logger.info(f'[!] Graph saved to {output_file}')
+        self.show_plot()
+
+        return results
+
 
 # Assuming Parameters class is defined elsewhere with a from_user_input() method
 
 
 if __name__ == "__main__":
+    configure_logging(os.environ.get('LOG_LEVEL', 'INFO'))
     parameters = Parameters.from_user_input()
     simulator = OptionSimulator(parameters)
     stock_index = simulator.run_simulation
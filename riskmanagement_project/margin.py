@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+'''
+    ------ MARGIN CALLS AND FORCED LIQUIDATION ------
+    Path-dependent check of the margin account behind the leveraged share position.
+    1. Debt = borrowed_amount plus the margin interest accrued so far; equity = share value (plus the puts when
+       include_puts=True) minus the debt
+    2. A margin call happens on the first day equity falls below maintenance_margin x share value, found for
+       every path at once with one comparison over the (paths x days) matrix and an argmax
+    3. A called path is liquidated that day: shares (less liquidation_cost) and puts are sold, the debt is
+       repaid and the position value stays at the liquidation value for the rest of the horizon. Proceeds
+       below the debt leave a deficit owed to the broker
+
+    Full liquidation on the first call keeps the outcome of a path a function of its first call day, so no
+    per-day loop is needed. Parameters.margin_requirement is the initial requirement; the maintenance level
+    is set separately (25% by default, the usual exchange minimum).
+'''
+
+DEFAULT_MAINTENANCE_MARGIN = 0.25
+
+
+@dataclass
+class MarginResults:
+    call_days: np.ndarray           # (n_paths,) first margin-call day, -1 if never called
+    liquidation_values: np.ndarray  # (n_paths,) position value after the forced sale, NaN if never called
+    deficits: np.ndarray            # (n_paths,) debt left unpaid by the liquidation proceeds
+    position_values: np.ndarray     # (n_paths, time_horizon_step) position values with liquidation applied
+    maintenance_margin: float
+
+    @property
+    def called(self):
+        return self.call_days >= 0
+
+    @property
+    def call_fraction(self):
+        """Fraction of paths that hit a margin call."""
+        return float(np.mean(self.called))
+
+    def called_by_day(self):
+        """Cumulative fraction of paths called by the end of each day."""
+        steps = self.position_values.shape[1]
+        counts = np.bincount(self.call_days[self.called], minlength=steps)
+        return pd.DataFrame({'Day': np.arange(steps),
+                             'Paths Called (%)': 100 * np.cumsum(counts) / len(self.call_days)})
+
+    def summary(self):
+        """Margin-call frequency, timing, deficits and the terminal value with liquidation applied."""
+        call_days = self.call_days[self.called]
+        rows = [
+            ('Paths', len(self.call_days)),
+            ('Maintenance Margin (%)', 100 * self.maintenance_margin),
+            ('Paths Called (%)', 100 * self.call_fraction),
+            ('Mean First Call Day', call_days.mean() if call_days.size else np.nan),
+            ('Earliest Call Day', call_days.min() if call_days.size else np.nan),
+            ('Paths With Deficit (%)', 100 * np.mean(self.deficits > 0)),
+            ('Mean Deficit', self.deficits.mean()),
+            ('Mean Terminal Value (Liquidated)', self.position_values[:, -1].mean()),
+        ]
+        return pd.DataFrame(rows, columns=['Statistic', 'Value'])
+
+
+def check_margin(results, parameters, maintenance_margin=DEFAULT_MAINTENANCE_MARGIN, include_puts=False,
+                 liquidation_cost=0.0):
+    """
+    Apply the maintenance-margin check to every path and day of a valuation.
+
+    Parameters:
+    results (MonteCarloResults): Output of MonteCarloSimulator.value_hedged_position / run().
+    parameters (Parameters): The parameters the results were valued with.
+    maintenance_margin (float): Minimum equity as a fraction of the share value.
+    include_puts (bool): Count the long puts as collateral (brokers usually do not).
+    liquidation_cost (float): Fraction of the share sale proceeds lost in a forced sale.
+
+    Returns:
+    MarginResults
+    """
+    stock_prices = results.stock_prices
+    share_values = parameters.num_shares * stock_prices
+    borrowed_amount = parameters.num_shares * parameters.initial_equity_price * (1 - parameters.margin_requirement)
+    debt = borrowed_amount + results.margin_interest
+
+    equity = share_values - debt
+    if include_puts:
+        equity += results.put_option_values
+    margin_call = equity < maintenance_margin * share_values
+    call_days = np.where(margin_call.any(axis=1), margin_call.argmax(axis=1), -1)
+
+    called = call_days >= 0
+    paths = np.flatnonzero(called)
+    days = call_days[called]
+    share_proceeds = (1 - liquidation_cost) * share_values[paths, days]
+    proceeds = share_proceeds + results.put_option_values[paths, days]
+    # Same convention as the position value: gross of the loan, net of the interest accrued so far
+    liquidation_values = np.full(len(call_days), np.nan)
+    liquidation_values[paths] = proceeds - results.margin_interest[days]
+    deficits = np.zeros(len(call_days))
+    deficits[paths] = np.maximum(debt[days] - proceeds, 0.0)
+
+    after_call = (np.arange(stock_prices.shape[1]) >= call_days[:, np.newaxis]) & called[:, np.newaxis]
+    position_values = np.where(after_call, liquidation_values[:, np.newaxis], results.position_values)
+    return MarginResults(call_days=call_days, liquidation_values=liquidation_values, deficits=deficits,
+                         position_values=position_values, maintenance_margin=maintenance_margin)
@@ -0,0 +1,667 @@
+import os
+from contextlib import nullcontext
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from american_options import american_put_binomial, american_put_binomial_greeks
+from black_scholes import black_scholes_put, black_scholes_put_greeks
+from risk_metrics import risk_report, value_at_risk_standard_error
+from streaming_statistics import RunningMoments, StreamingHistogram
+from result_cache import ResultCache, cache_key
+from variance_reduction import (VARIANCE_REDUCTION_METHODS, antithetic_normals, brownian_bridge,
+                                control_variate_adjust, lognormal_control_means, sobol_normals, standard_error)
+
+
+'''
+    ------ MONTE CARLO SIMULATOR ------
+    Multi-path version of OptionSimulator. Instead of a single GBM draw:
+    1. Generate an (n_paths x time_horizon_step) matrix of stock prices in one vectorized call
+    2. Value the hedged position (shares + puts - margin interest) across every path at once
+    3. Summarize the distribution of the total position value
+
+    Paths are generated in fixed-size blocks, each with its own np.random.Generator spawned from one
+    SeedSequence. Blocks can be spread over a process pool, and because the block layout never depends on
+    the number of workers, the results are bit-identical for any worker count.
+
+    run(..., cache=ResultCache()) loads the results of an identical earlier run from disk instead of simulating.
+    Entries keep only the paths, put values and roll schedule in float32 (about a quarter of the full results);
+    strikes and position values are rebuilt on load.
+
+    Streaming mode (run_streaming) folds each block into online accumulators and then discards it, so peak
+    memory is one block regardless of the path count.
+
+    Sequential mode (run_sequential) adds blocks until the standard error of the mean terminal value or of the
+    terminal VaR meets a tolerance, so the path count follows the difficulty of the scenario. The block size is
+    fixed for the whole run and stored on the results, so estimate_terminal_value() and run(...,
+    block_size=results.block_size) split the paths the same way.
+
+    variance_reduction selects how the normal draws are made: 'plain', 'antithetic' or 'sobol' (quasi-random
+    with a Brownian bridge). Sobol blocks are powers of two and each one is an independent scrambled replicate,
+    so a run always has at least SOBOL_MIN_REPLICATES blocks for the standard error when the path count allows.
+
+    option_style='american' values the puts on a binomial lattice (american_options.py) instead of Black-Scholes.
+    That costs one lattice per path and day, so it is meant for modest path counts.
+    volatility_surface prices the puts at smile volatilities (volatility_surface.py); the stock paths keep
+    Parameters.volatility.
+'''
+
+ENGINE_VERSION = 2  # Bump whenever a change alters the simulated output, so cached results are not reused
+DEFAULT_BLOCK_SIZE = 10_000
+SOBOL_MIN_REPLICATES = 16
+SEQUENTIAL_SOBOL_BLOCK_SIZE = 1024  # Sobol replicate size of sequential runs, independent of max_paths
+SUMMARY_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+OPTION_STYLES = ('european', 'american')
+STOPPING_STATISTICS = ('mean', 'var')
+
+
+def split_blocks(n_paths, block_size):
+    """Sizes of the fixed-size blocks covering n_paths paths; only the last block may be shorter."""
+    n_blocks = max(1, -(-n_paths // block_size))
+    return [block_size] * (n_blocks - 1) + [n_paths - block_size * (n_blocks - 1)]
+
+
+def put_strike_schedule(parameters, roll_days, days):
+    """(n_paths, days) strikes held: strike_price_PUT before each path's roll day, trigger_price_PUT from it on."""
+    rolled = (days >= roll_days[:, np.newaxis]) & (roll_days[:, np.newaxis] >= 0)
+    return np.where(rolled, parameters.trigger_price_PUT, parameters.strike_price_PUT)
+
+
+def summary_frame(n_paths, mean, std, minimum, percentile_values, maximum, rolled_fraction,
+                   percentiles=SUMMARY_PERCENTILES):
+    """Lay out the terminal position value statistics shared by the in-memory and streaming results."""
+    rows = [('Paths', n_paths), ('Mean', mean), ('Std Dev', std), ('Min', minimum)]
+    rows += [(f'P{pct}', value) for pct, value in zip(percentiles, percentile_values)]
+    rows += [('Max', maximum), ('Paths Rolled (%)', 100 * rolled_fraction)]
+    return pd.DataFrame(rows, columns=['Statistic', 'Total Position Value'])
+
+
+@dataclass
+class MonteCarloResults:
+    stock_prices: np.ndarray        # (n_paths, time_horizon_step)
+    put_strike_prices: np.ndarray   # (n_paths, time_horizon_step)
+    put_option_values: np.ndarray   # (n_paths, time_horizon_step)
+    margin_interest: np.ndarray     # (time_horizon_step,) same for every path
+    position_values: np.ndarray     # (n_paths, time_horizon_step)
+    roll_days: np.ndarray           # (n_paths,) day the puts were rolled, -1 if never
+    position_greeks: dict = None    # 'delta', 'gamma', 'vega', 'theta', 'rho' -> (n_paths, time_horizon_step)
+    block_size: int = None          # Paths per simulated block (the last may be shorter); None = unknown
+
+    @property
+    def n_paths(self):
+        return self.stock_prices.shape[0]
+
+    def block_sizes(self):
+        """Sizes of the blocks the paths were simulated in, or None when block_size is unknown."""
+        return None if self.block_size is None else split_blocks(self.n_paths, self.block_size)
+
+    @property
+    def terminal_position_values(self):
+        return self.position_values[:, -1]
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES):
+        """Summarize the terminal total position value across all paths."""
+        terminal = self.terminal_position_values
+        return summary_frame(
+            self.n_paths, terminal.mean(), terminal.std(ddof=1) if self.n_paths > 1 else 0.0, terminal.min(),
+            np.percentile(terminal, percentiles), terminal.max(), np.mean(self.roll_days >= 0), percentiles)
+
+    def hedge_ratio_summary(self):
+        """Per-day distribution of the position delta (shares + puts) across all paths; needs greeks=True."""
+        if self.position_greeks is None:
+            raise ValueError("Position Greeks were not computed. Run the simulation with greeks=True.")
+        delta = self.position_greeks['delta']
+        p5, p50, p95 = np.percentile(delta, [5, 50, 95], axis=0)
+        return pd.DataFrame({
+            'Day': np.arange(delta.shape[1]),
+            'Mean Position Delta': delta.mean(axis=0),
+            'P5 Position Delta': p5,
+            'P50 Position Delta': p50,
+            'P95 Position Delta': p95,
+            'Mean Position Gamma': self.position_greeks['gamma'].mean(axis=0),
+            'Mean Position Vega': self.position_greeks['vega'].mean(axis=0),
+            'Mean Position Theta': self.position_greeks['theta'].mean(axis=0),
+        })
+
+    def to_arrays(self, compact=False):
+        """
+        Flat dict of the result arrays, e.g. for ResultCache.
+
+        compact=True keeps only the paths, put values and Greeks (as float32) and the roll schedule; the strikes
+        and position values are rebuilt from them by from_arrays(arrays, parameters).
+        """
+        derived = ('put_strike_prices', 'position_values') if compact else ()
+        arrays = {name: value for name, value in vars(self).items()
+                  if name not in ('position_greeks', 'block_size') + derived}
+        for name, value in (self.position_greeks or {}).items():
+            arrays[f'greek_{name}'] = value
+        if compact:
+            arrays = {name: value.astype(np.float32) if value.ndim == 2 else value for name, value in arrays.items()}
+            arrays['roll_days'] = self.roll_days.astype(np.int32)
+        if self.block_size is not None:
+            arrays['block_size'] = np.int64(self.block_size)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, parameters=None):
+        """Inverse of to_arrays(); compact arrays need the Parameters they were valued with."""
+        arrays = dict(arrays)
+        greeks = {name[len('greek_'):]: arrays.pop(name).astype(float)
+                  for name in list(arrays) if name.startswith('greek_')}
+        block_size = arrays.pop('block_size', None)
+        if 'position_values' not in arrays:
+            if parameters is None:
+                raise ValueError("Compact results need the Parameters they were valued with")
+            stock_prices = arrays['stock_prices'].astype(float)
+            put_option_values = arrays['put_option_values'].astype(float)
+            roll_days = arrays['roll_days'].astype(np.int64)
+            # In place, so the rebuild allocates no temporaries beyond the position values themselves
+            position_values = parameters.num_shares * stock_prices
+            position_values += put_option_values
+            position_values -= arrays['margin_interest']
+            arrays.update(
+                stock_prices=stock_prices, put_option_values=put_option_values, roll_days=roll_days,
+                put_strike_prices=put_strike_schedule(parameters, roll_days, np.arange(stock_prices.shape[1])),
+                position_values=position_values)
+        return cls(**arrays, position_greeks=greeks or None,
+                   block_size=None if block_size is None else int(block_size))
+
+    @classmethod
+    def concatenate(cls, blocks):
+        """Join the results of consecutive path blocks into one result set."""
+        if len(blocks) == 1:
+            return blocks[0]
+        return cls(
+            stock_prices=np.concatenate([block.stock_prices for block in blocks]),
+            put_strike_prices=np.concatenate([block.put_strike_prices for block in blocks]),
+            put_option_values=np.concatenate([block.put_option_values for block in blocks]),
+            margin_interest=blocks[0].margin_interest,
+            position_values=np.concatenate([block.position_values for block in blocks]),
+            roll_days=np.concatenate([block.roll_days for block in blocks]),
+            position_greeks=None if blocks[0].position_greeks is None else {
+                name: np.concatenate([block.position_greeks[name] for block in blocks])
+                for name in blocks[0].position_greeks},
+        )
+
+
+class StreamingMonteCarloResults:
+    """Constant-memory summary of a streaming run, built block by block with online accumulators."""
+
+    def __init__(self, margin_interest, n_bins=10_000):
+        self.margin_interest = margin_interest
+        self.terminal_moments = RunningMoments()       # Mean / variance of the terminal position value
+        self.terminal_histogram = StreamingHistogram(n_bins)  # Quantile sketch of the terminal position value
+        self.position_value_moments = RunningMoments()  # Per-day mean / variance of the position value
+        self.n_rolled = 0
+
+    @property
+    def n_paths(self):
+        return self.terminal_moments.count
+
+    def update(self, block):
+        """Fold one block of MonteCarloResults into the accumulators."""
+        self.terminal_moments.update(block.terminal_position_values)
+        self.terminal_histogram.update(block.terminal_position_values)
+        self.position_value_moments.update(block.position_values)
+        self.n_rolled += int(np.count_nonzero(block.roll_days >= 0))
+        return self
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES):
+        """Same table as MonteCarloResults.summary(); percentiles are accurate to one histogram bin."""
+        return summary_frame(
+            self.n_paths, self.terminal_moments.mean, self.terminal_moments.std, self.terminal_histogram.min,
+            self.terminal_histogram.percentile(percentiles), self.terminal_histogram.max,
+            self.n_rolled / self.n_paths, percentiles)
+
+
+@dataclass
+class SequentialMonteCarloResults:
+    results: object              # MonteCarloResults, or StreamingMonteCarloResults for a streaming run
+    statistic: str               # 'mean' or 'var'
+    target_std_error: float       # Tolerance, in dollars or as a fraction of the estimate (relative)
+    relative: bool
+    converged: bool              # False when max_paths was reached first
+    history: pd.DataFrame        # Paths, Estimate and Std Error after every round of blocks
+
+    @property
+    def n_paths(self):
+        return self.results.n_paths
+
+    @property
+    def estimate(self):
+        return self.history['Estimate'].iloc[-1]
+
+    @property
+    def std_error(self):
+        return self.history['Std Error'].iloc[-1]
+
+    def convergence(self):
+        """Target, achieved standard error and the number of paths it took."""
+        rows = [
+            ('Statistic', self.statistic),
+            ('Target Std Error', f"{100 * self.target_std_error:g}%" if self.relative else self.target_std_error),
+            ('Estimate', self.estimate),
+            ('Std Error', self.std_error),
+            ('Paths Needed', self.n_paths),
+            ('Converged', self.converged),
+        ]
+        return pd.DataFrame(rows, columns=['Statistic', 'Value'])
+
+
+def _run_block(parameters, seed_sequence, n_paths, greeks=False, settings=None):
+    """Process-pool entry point: simulate and value one block of paths from its own RNG stream."""
+    return MonteCarloSimulator(parameters, **(settings or {})).run_block(seed_sequence, n_paths, greeks)
+
+
+class MonteCarloSimulator:
+    def __init__(self, parameters, seed=42, block_size=DEFAULT_BLOCK_SIZE, variance_reduction='plain',
+                 path_generator=None, option_style='european', volatility_surface=None):
+        if variance_reduction not in VARIANCE_REDUCTION_METHODS:
+            raise ValueError(f"Unknown variance reduction '{variance_reduction}' "
+                             f"(use one of {', '.join(VARIANCE_REDUCTION_METHODS)})")
+        if option_style not in OPTION_STYLES:
+            raise ValueError(f"Unknown option style '{option_style}' (use one of {', '.join(OPTION_STYLES)})")
+        if path_generator is not None and variance_reduction != 'plain':
+            raise ValueError("Variance reduction applies to the built-in GBM only, not to a path_generator")
+        self.parameters = parameters
+        self.adjusted_time_step = 1 / self.parameters.time_step
+        self.borrowed_amount = self.parameters.num_shares * self.parameters.initial_equity_price * (
+                1 - self.parameters.margin_requirement)
+        self.daily_margin_rate = self.parameters.margin_rate / self.parameters.time_step
+        self.seed_sequence = np.random.SeedSequence(seed)  # seed=None draws fresh entropy for every simulator
+        self.block_size = block_size
+        self.variance_reduction = variance_reduction
+        self.path_generator = path_generator  # A path_generators.PathGenerator; None uses the built-in GBM
+        self.option_style = option_style  # 'european' (Black-Scholes) or 'american' (binomial lattice) puts
+        self.volatility_surface = volatility_surface  # A volatility_surface.VolatilitySurface; None = constant vol
+
+    def settings(self):
+        """Keyword arguments that rebuild this simulator's engine options, e.g. in a worker process."""
+        return {'block_size': self.block_size, 'variance_reduction': self.variance_reduction,
+                'path_generator': self.path_generator, 'option_style': self.option_style,
+                'volatility_surface': self.volatility_surface}
+
+    def path_block_size(self, n_paths):
+        """Paths per block: block_size, or for Sobol the largest power of two leaving enough replicates."""
+        if self.variance_reduction != 'sobol':
+            return self.block_size
+        return 1 << int(np.log2(max(1, min(self.block_size, n_paths // SOBOL_MIN_REPLICATES))))
+
+    def block_seed_sequences(self, n_paths, block_size=None):
+        """
+        Split n_paths into fixed-size blocks, each paired with an independent child SeedSequence.
+        block_size overrides path_block_size(n_paths), e.g. to reproduce a sequential run.
+        """
+        sizes = split_blocks(n_paths, self.path_block_size(n_paths) if block_size is None else block_size)
+        # Spawn from a fresh copy so repeated runs of this simulator draw the same streams
+        children = np.random.SeedSequence(self.seed_sequence.entropy).spawn(len(sizes))
+        return list(zip(children, sizes))
+
+    def drift_times(self):
+        """Times in years at which the GBM drift is applied, one per simulated day."""
+        return np.linspace(0, self.parameters.time_horizon * self.adjusted_time_step, self.parameters.time_horizon_step)
+
+    def simulate_brownian_paths(self, n_paths, rng=None):
+        """Simulate an (n_paths x time_horizon_step) matrix of standard Brownian motion on the daily grid."""
+        if rng is None:
+            rng = np.random.default_rng(self.seed_sequence)
+        steps = self.parameters.time_horizon_step
+
+        if self.variance_reduction == 'sobol':
+            times = self.adjusted_time_step * np.arange(1, steps + 1)
+            return brownian_bridge(sobol_normals(rng, n_paths, steps), times)
+
+        # Work in place on the normal draws so only one (n_paths x steps) matrix is allocated
+        if self.variance_reduction == 'antithetic':
+            brownian = antithetic_normals(rng, n_paths, steps)
+        else:
+            brownian = rng.standard_normal(size=(n_paths, steps))
+        np.cumsum(brownian, axis=1, out=brownian)
+        brownian *= np.sqrt(self.adjusted_time_step)
+        return brownian
+
+    def simulate_stock_price_paths(self, n_paths, rng=None):
+        """Simulate an (n_paths x time_horizon_step) matrix of stock prices (GBM unless a path_generator is set)."""
+        if self.path_generator is not None:
+            if rng is None:
+                rng = np.random.default_rng(self.seed_sequence)
+            return self.path_generator.simulate(self.parameters, n_paths, rng)
+        return self.prices_from_brownian(self.simulate_brownian_paths(n_paths, rng))
+
+    def prices_from_brownian(self, brownian):
+        """GBM stock prices from (..., time_horizon_step) standard Brownian paths, computed in place."""
+        drift = (self.parameters.annual_expected_return - 0.5 * self.parameters.volatility ** 2) * self.drift_times()
+        prices = brownian
+        prices *= self.parameters.volatility
+        prices += drift
+        np.exp(prices, out=prices)
+        prices *= self.parameters.initial_equity_price
+        return prices
+
+    def black_scholes_put(self, equity_price, put_strike, time_to_expiration):
+        """Price puts for any broadcastable arrays of equity prices, strikes and times to expiration."""
+        return black_scholes_put(equity_price, put_strike, time_to_expiration,
+                                 self.parameters.risk_free_rate, self.parameters.volatility)
+
+    def put_volatility(self, equity_price, put_strike, time_to_expiration):
+        """Pricing volatility of the puts: Parameters.volatility, or the smile of the volatility_surface."""
+        if self.volatility_surface is None:
+            return self.parameters.volatility
+        return self.volatility_surface.implied_volatility(equity_price, put_strike, time_to_expiration,
+                                                          reference_price=self.parameters.initial_equity_price)
+
+    def price_puts(self, equity_price, put_strike, time_to_expiration, greeks=False, volatility=None):
+        """
+        Price puts in the simulator's option style; greeks=True returns PutGreeks instead of prices.
+        volatility overrides put_volatility() (e.g. shocked volatilities).
+        """
+        if self.option_style == 'american':
+            pricer = american_put_binomial_greeks if greeks else american_put_binomial
+        else:
+            pricer = black_scholes_put_greeks if greeks else black_scholes_put
+        if volatility is None:
+            volatility = self.put_volatility(equity_price, put_strike, time_to_expiration)
+        return pricer(equity_price, put_strike, time_to_expiration, self.parameters.risk_free_rate, volatility)
+
+    def initial_position_value(self):
+        """Value of the shares plus the initial puts at inception, the reference point for P&L."""
+        put_price = self.price_puts(self.parameters.initial_equity_price, self.parameters.strike_price_PUT,
+                                    self.parameters.time_horizon * self.adjusted_time_step)
+        return self.parameters.num_shares * self.parameters.initial_equity_price \
+            + self.parameters.num_puts * 100 * put_price
+
+    def control_means(self):
+        """Closed-form E[S_T] and E[max(strike_price_PUT - S_T, 0)] under the simulated GBM."""
+        steps = self.parameters.time_horizon_step
+        log_drift = (self.parameters.annual_expected_return - 0.5 * self.parameters.volatility ** 2) \
+            * self.drift_times()[-1]
+        log_variance = self.parameters.volatility ** 2 * steps * self.adjusted_time_step
+        return lognormal_control_means(self.parameters.initial_equity_price, log_drift, log_variance,
+                                       self.parameters.strike_price_PUT)
+
+    def estimate_terminal_value(self, results, control_variate=None):
+        """
+        Estimate the expected terminal position value and its standard error.
+
+        Parameters:
+        results (MonteCarloResults): In-memory results of run() on this simulator.
+        control_variate (bool): Regress out the terminal stock price and the terminal payoff of the initial put,
+                                whose expectations are known in closed form under the built-in GBM.
+                                None (default) uses them whenever no path_generator is set.
+
+        Returns:
+        dict: Method, Paths, Estimate, Std Error.
+        """
+        block_sizes = results.block_sizes() or [size for _, size in self.block_seed_sequences(results.n_paths)]
+        return self._terminal_value_estimate(results.terminal_position_values, results.stock_prices[:, -1],
+                                             block_sizes, control_variate)
+
+    def _terminal_value_estimate(self, values, terminal_prices, block_sizes, control_variate=None):
+        """estimate_terminal_value() from the terminal values and stock prices of blocks of the given sizes."""
+        if control_variate is None:
+            control_variate = self.path_generator is None
+        elif control_variate and self.path_generator is not None:
+            raise ValueError("The control variates assume the built-in GBM; use control_variate=False")
+        n_paths = len(values)
+        if control_variate:
+            controls = np.column_stack([terminal_prices,
+                                        np.maximum(self.parameters.strike_price_PUT - terminal_prices, 0.0)])
+            values, _ = control_variate_adjust(values, controls, self.control_means())
+        estimate, error = standard_error(values, block_sizes, self.variance_reduction)
+        method = self.variance_reduction + (' + control variate' if control_variate else '')
+        return {'Method': method, 'Paths': n_paths, 'Estimate': estimate, 'Std Error': error}
+
+    def risk_report(self, results, confidence_levels=(0.95, 0.99), horizons=None, **kwargs):
+        """VaR / ES report of an in-memory run; horizons default to 1 day, 10 days and the full horizon."""
+        if horizons is None:
+            horizons = sorted({1, min(10, self.parameters.time_horizon_step), self.parameters.time_horizon_step})
+        return risk_report(results.position_values, self.initial_position_value(),
+                           confidence_levels=confidence_levels, horizons=horizons, **kwargs)
+
+    def value_hedged_position(self, stock_prices, greeks=False, first_day=0, prior_roll_days=None):
+        """
+        Apply the put-roll strategy of OptionSimulator.run_simulation to every path at once.
+
+        The puts are priced by price_puts (Black-Scholes, or the binomial lattice for option_style='american').
+        With greeks=True the price and the Greeks come from one kernel, and the position-level Greeks
+        (share delta + put Greeks x 100 x num_puts) are stored on the results.
+
+        first_day and prior_roll_days value a continuation segment (see SimulationCheckpoint): stock_prices then
+        holds days first_day onwards, and paths that already rolled before first_day keep their roll day.
+        """
+        n_paths, steps = stock_prices.shape
+        days = first_day + np.arange(steps)
+
+        # The puts are rolled up to the trigger strike on the first day the trigger price is reached
+        crossed = stock_prices >= self.parameters.trigger_price
+        roll_days = np.where(crossed.any(axis=1), first_day + crossed.argmax(axis=1), -1)
+        if prior_roll_days is not None:
+            roll_days = np.where(prior_roll_days >= 0, prior_roll_days, roll_days)
+
+        # Strike schedule by masking: original strike before the roll day, trigger strike from it onwards
+        put_strike_prices = put_strike_schedule(self.parameters, roll_days, days)
+
+        # Price every (path, day) point in one call
+        adjusted_time_to_expiration = (self.parameters.time_horizon - days) * self.adjusted_time_step
+        contracts = self.parameters.num_puts * 100
+        position_greeks = None
+        if greeks:
+            put = self.price_puts(stock_prices, put_strike_prices, adjusted_time_to_expiration, greeks=True)
+            put_option_values = contracts * put.price
+            position_greeks = {
+                'delta': self.parameters.num_shares + contracts * put.delta,
+                'gamma': contracts * put.gamma,
+                'vega': contracts * put.vega,
+                'theta': contracts * put.theta,
+                'rho': contracts * put.rho,
+            }
+        else:
+            put_option_values = contracts * self.price_puts(stock_prices, put_strike_prices,
+                                                            adjusted_time_to_expiration)
+
+        margin_interest = self.borrowed_amount * self.daily_margin_rate * (days + 1)
+        position_values = self.parameters.num_shares * stock_prices + put_option_values - margin_interest
+
+        return MonteCarloResults(
+            stock_prices=stock_prices,
+            put_strike_prices=put_strike_prices,
+            put_option_values=put_option_values,
+            margin_interest=margin_interest,
+            position_values=position_values,
+            roll_days=roll_days,
+            position_greeks=position_greeks,
+        )
+
+    def run_block(self, seed_sequence, n_paths, greeks=False):
+        """Simulate and value one block of n_paths paths drawn from seed_sequence."""
+        stock_prices = self.simulate_stock_price_paths(n_paths, np.random.default_rng(seed_sequence))
+        return self.value_hedged_position(stock_prices, greeks)
+
+    def cache_key(self, n_paths, greeks=False, block_size=None):
+        """Key of a run in the result cache: everything that determines its output."""
+        return cache_key(parameters=self.parameters.to_dict(), entropy=self.seed_sequence.entropy, n_paths=n_paths,
+                         block_size=self.path_block_size(n_paths) if block_size is None else block_size,
+                         variance_reduction=self.variance_reduction, greeks=greeks,
+                         path_generator=None if self.path_generator is None else self.path_generator.describe(),
+                         option_style=self.option_style,
+                         volatility_surface=None if self.volatility_surface is None
+                         else self.volatility_surface.describe(),
+                         engine_version=ENGINE_VERSION)
+
+    def run(self, n_paths, max_workers=1, greeks=False, cache=None, checkpoint_dir=None, block_size=None):
+        """
+        Simulate n_paths price paths and value the hedged position along each of them.
+
+        Parameters:
+        n_paths (int): Number of simulated paths.
+        max_workers (int): Worker processes for the path blocks; 1 runs in-process, None uses every CPU.
+        greeks (bool): Also compute the position-level Greeks for every path and day.
+        cache (ResultCache): Reuse the stored results of an identical run and store new ones. None disables it.
+        checkpoint_dir (str): Save each completed block here and reuse the blocks already saved, so an
+                              interrupted run resumes from its last completed block. Cleared once the run ends.
+        block_size (int): Paths per block instead of path_block_size(n_paths), e.g. the block_size of a
+                          sequential run's results to reproduce its paths.
+        """
+        if cache is not None:
+            key = self.cache_key(n_paths, greeks, block_size)
+            arrays = cache.get(key)
+            if arrays is None:
+                arrays = self.run(n_paths, max_workers, greeks, checkpoint_dir=checkpoint_dir,
+                                  block_size=block_size).to_arrays(compact=True)
+                cache.put(key, arrays)
+            # Rebuilt from the compact entry on a miss too, so a run returns the same results whether or not it hit
+            return MonteCarloResults.from_arrays(arrays, self.parameters)
+
+        blocks = self.block_seed_sequences(n_paths, block_size)
+        results = [None] * len(blocks)
+        if checkpoint_dir is not None:
+            store = ResultCache(checkpoint_dir, max_bytes=np.inf)
+            run_key = self.cache_key(n_paths, greeks, block_size)
+            block_keys = [f"{run_key}-{index}" for index in range(len(blocks))]
+            for index, block_key in enumerate(block_keys):
+                arrays = store.get(block_key)
+                if arrays is not None:
+                    results[index] = MonteCarloResults.from_arrays(arrays)
+
+        def complete(index, block_results):
+            results[index] = block_results
+            if checkpoint_dir is not None:
+                store.put(block_keys[index], block_results.to_arrays())
+
+        pending = [index for index, block_results in enumerate(results) if block_results is None]
+        if max_workers == 1 or len(pending) <= 1:
+            for index in pending:
+                seed_sequence, size = blocks[index]
+                complete(index, self.run_block(seed_sequence, size, greeks))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(_run_block, self.parameters, *blocks[index], greeks,
+                                           self.settings()): index for index in pending}
+                for future in as_completed(futures):
+                    complete(futures[future], future.result())
+
+        if checkpoint_dir is not None:
+            for block_key in block_keys:
+                store.discard(block_key)
+        results = MonteCarloResults.concatenate(results)
+        results.block_size = blocks[0][1]
+        return results
+
+    def run_streaming(self, n_paths, max_workers=1, n_bins=10_000):
+        """
+        Simulate n_paths paths block by block, keeping only online statistics (constant memory in n_paths).
+
+        Uses the same blocks and random streams as run(), so the summary matches an in-memory run of the same
+        seed: exact count, mean, standard deviation, min, max and roll fraction, percentiles to one bin width.
+        """
+        blocks = self.block_seed_sequences(n_paths)
+        results = StreamingMonteCarloResults(
+            self.borrowed_amount * self.daily_margin_rate * np.arange(1, self.parameters.time_horizon_step + 1),
+            n_bins=n_bins)
+
+        if max_workers == 1 or len(blocks) == 1:
+            for seed_sequence, size in blocks:
+                results.update(self.run_block(seed_sequence, size))
+        else:
+            # Submit a bounded window of blocks so finished blocks never pile up in memory
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                window = 2 * (max_workers or os.cpu_count() or 1)
+                pending = []
+                for seed_sequence, size in blocks:
+                    pending.append(executor.submit(_run_block, self.parameters, seed_sequence, size, False,
+                                                   self.settings()))
+                    if len(pending) >= window:
+                        results.update(pending.pop(0).result())
+                for future in pending:
+                    results.update(future.result())
+        return results
+
+    def run_sequential(self, target_std_error, statistic='mean', confidence=0.95, relative=False,
+                       max_paths=1_000_000, min_paths=None, max_workers=1, streaming=False, control_variate=None):
+        """
+        Simulate blocks until the standard error of the target statistic meets target_std_error.
+
+        Parameters:
+        target_std_error (float): Tolerance on the standard error, in dollars (a fraction of |estimate| if relative).
+        statistic (str): 'mean' (expected terminal position value, as estimate_terminal_value) or 'var'
+                         (VaR of the terminal loss at confidence, distribution-free standard error).
+        confidence (float): VaR confidence level for statistic='var'.
+        relative (bool): Read target_std_error as a fraction of the estimate.
+        max_paths (int): Stop here even if the tolerance is not met (converged is then False).
+        min_paths (int): Never stop earlier; defaults to two blocks so the first error estimate is not trusted.
+                         Sobol runs use replicates of SEQUENTIAL_SOBOL_BLOCK_SIZE paths and never stop before
+                         SOBOL_MIN_REPLICATES of them.
+        max_workers (int): Blocks simulated per round (in a process pool when > 1); the tolerance is checked
+                           after every round. None uses every CPU.
+        streaming (bool): Keep online statistics instead of every path, as run_streaming.
+        control_variate (bool): For statistic='mean', as in estimate_terminal_value.
+
+        Returns:
+        SequentialMonteCarloResults: its results carry the block_size of the run, so
+        run(results.n_paths, block_size=results.block_size) reproduces the same paths.
+        """
+        if statistic not in STOPPING_STATISTICS:
+            raise ValueError(f"Unknown stopping statistic '{statistic}' (use one of {', '.join(STOPPING_STATISTICS)})")
+        # One block layout for the whole run, whatever the path count it stops at. Sobol replicates stay small
+        # so the replicate minimum does not grow with max_paths
+        block_size = self.path_block_size(max_paths)
+        if self.variance_reduction == 'sobol':
+            block_size = min(block_size, SEQUENTIAL_SOBOL_BLOCK_SIZE)
+        blocks = self.block_seed_sequences(max_paths, block_size)
+        min_paths = 2 * block_size if min_paths is None else min_paths
+        if self.variance_reduction == 'sobol':
+            min_paths = max(min_paths, SOBOL_MIN_REPLICATES * block_size)
+        min_paths = min(min_paths, max_paths)
+        initial_value = self.initial_position_value() if statistic == 'var' else None
+        round_size = 1 if max_workers == 1 else (max_workers or os.cpu_count() or 1)
+
+        kept = StreamingMonteCarloResults(
+            self.borrowed_amount * self.daily_margin_rate * np.arange(1, self.parameters.time_horizon_step + 1)
+        ) if streaming else []
+        # Only the terminal values and stock prices are needed for the standard error; filled block by block
+        terminal_values, terminal_prices = np.empty(max_paths), np.empty(max_paths)
+        block_sizes, history = [], []
+        n_paths = 0
+        converged = False
+        with ProcessPoolExecutor(max_workers=max_workers) if round_size > 1 else nullcontext() as executor:
+            for start in range(0, len(blocks), round_size):
+                seed_sequences, sizes = zip(*blocks[start:start + round_size])
+                if executor is None:
+                    round_results = [self.run_block(seed_sequence, size)
+                                     for seed_sequence, size in zip(seed_sequences, sizes)]
+                else:
+                    round_results = list(executor.map(_run_block, repeat(self.parameters), seed_sequences, sizes,
+                                                      repeat(False), repeat(self.settings())))
+                for block in round_results:
+                    if streaming:
+                        kept.update(block)
+                    else:
+                        kept.append(block)
+                    terminal_values[n_paths:n_paths + block.n_paths] = block.terminal_position_values
+                    terminal_prices[n_paths:n_paths + block.n_paths] = block.stock_prices[:, -1]
+                    block_sizes.append(block.n_paths)
+                    n_paths += block.n_paths
+
+                values = terminal_values[:n_paths]
+                if statistic == 'mean':
+                    estimate = self._terminal_value_estimate(values, terminal_prices[:n_paths], block_sizes,
+                                                             control_variate)
+                    estimate, error = estimate['Estimate'], estimate['Std Error']
+                else:
+                    estimate, error = value_at_risk_standard_error(initial_value - values, confidence)
+                history.append({'Paths': values.size, 'Estimate': estimate, 'Std Error': error})
+                tolerance = target_std_error * abs(estimate) if relative else target_std_error
+                if values.size >= min_paths and error <= tolerance:
+                    converged = True
+                    break
+
+        if not streaming:
+            kept = MonteCarloResults.concatenate(kept)
+            kept.block_size = block_size
+        return SequentialMonteCarloResults(
+            results=kept, statistic=statistic,
+            target_std_error=target_std_error, relative=relative, converged=converged,
+            history=pd.DataFrame(history))
@@ -1,10 +1,14 @@
 import os
+import time
 import traceback
 
+import numpy as np
 import yfinance as yf
 import datetime
 import pandas as pd
 
+from implied_volatility import add_implied_volatility
+
 
 ''' CLASS - OptionData 
     1. Fetch option data based on user input
@@ -16,6 +20,7 @@ import pandas as pd
     7. Filter options by strike price
     8. Fetch historical data for a specific option contract
     10. Display the option data
+    11. Solve the implied volatility of the whole chain (implied_volatility.py) and keep it as a column
 [TODO]
     1. Add error handling for invalid user input
     2. Plot the historical data for the option contract
@@ -27,6 +32,7 @@ import stock_data
 
 StockData = stock_data.StockData()
 OptionInfo = main.Parameters
+DEFAULT_RISK_FREE_RATE = 0.01  # Used for implied volatility when no risk_free_rate is set on the instance
 
 ''' SUBCLASS - OptionData AND StockData to get the stock ticker and end date '''
 # class OptionData:
@@ -96,6 +102,14 @@ class OptionData(OptionInfo, StockData):
             traceback.print_exc()
             exit()
 
+        # Implied volatility of every contract in the chain, in the simulator's 252 trading-day year
+        spot = stock.history(period="5d")["Close"].iloc[-1]
+        trading_days = np.busday_count(datetime.date.today(), datetime.date.fromisoformat(self.expiration_date))
+        start = time.perf_counter()
+        options = add_implied_volatility(options, spot, trading_days / 252,
+                                         getattr(self, 'risk_free_rate', DEFAULT_RISK_FREE_RATE), self.option_type)
+        print(f"[!] Solved implied volatility for {len(options)} contracts in {time.perf_counter() - start:.3f}s")
+
         # Filter options by strike price
         option_data = options[options["strike"] == self.strike]
         if option_data.empty:
@@ -103,6 +117,8 @@ class OptionData(OptionInfo, StockData):
             exit()
 
         print(option_data.to_string(index=False))
+        print(f"[+] Implied volatility at strike {self.strike}: {option_data['Implied Volatility'].iloc[0]:.4f} "
+              f"(use as Parameters.volatility)")
 
         return option_data
 
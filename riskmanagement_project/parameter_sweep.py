@@ -0,0 +1,133 @@
+import itertools
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from black_scholes import black_scholes_put
+from monte_carlo import MonteCarloSimulator
+from parameters import Parameters
+from risk_metrics import tail_risk
+from variance_reduction import standard_error
+
+
+'''
+    ------ PARAMETER SWEEP ------
+    Evaluates a grid of parameter sets (e.g. strike_price_PUT x trigger_price_PUT x trigger_price x volatility)
+    in one batched computation instead of one OptionSimulator run per combination.
+    1. One matrix of Brownian paths is drawn for the whole sweep (common random numbers), so differences
+       between grid points come from the parameters and not from simulation noise
+    2. Stock prices are built once per (initial_equity_price, annual_expected_return, volatility) and the roll
+       days once per trigger_price; every other field only changes the valuation
+    3. Grid points sharing those paths are valued together as (points x paths) arrays: terminal position value,
+       VaR / ES of the terminal loss and the cost of the puts (initial premium + expected roll-up cost)
+
+    Only the terminal day is valued, so the cost per grid point is O(n_paths) rather than O(n_paths x days).
+    The time grid (time_horizon, time_step, time_horizon_step) is fixed by the base parameters.
+'''
+
+SWEEP_FIELDS = tuple(field.name for field in fields(Parameters)
+                     if field.name not in ('time_horizon', 'time_step', 'time_horizon_step'))
+PATH_FIELDS = ('initial_equity_price', 'annual_expected_return', 'volatility')
+MAX_CHUNK_ELEMENTS = 2_000_000  # Grid points x paths valued at once
+
+
+def sweep_grid(**axes):
+    """Cartesian grid of parameter values, e.g. sweep_grid(strike_price_PUT=[30, 35], volatility=[0.2, 0.3])."""
+    return pd.DataFrame(list(itertools.product(*axes.values())), columns=list(axes))
+
+
+def _value_points(points, terminal_prices, rolled, roll_prices, roll_times, base, confidence, block_sizes,
+                  variance_reduction):
+    """Value a chunk of grid points that share the same stock paths and roll days."""
+    def column(name):
+        return points[name].to_numpy(dtype=float)[:, np.newaxis]
+
+    dt = 1 / base.time_step
+    steps = base.time_horizon_step
+    initial_price, volatility, rate = column('initial_equity_price'), column('volatility'), column('risk_free_rate')
+    strike, trigger_strike = column('strike_price_PUT'), column('trigger_price_PUT')
+    shares, contracts = column('num_shares'), 100 * column('num_puts')
+
+    borrowed_amount = shares * initial_price * (1 - column('margin_requirement'))
+    margin_interest = borrowed_amount * column('margin_rate') / base.time_step * steps
+    initial_put_cost = contracts * black_scholes_put(initial_price, strike, base.time_horizon * dt, rate, volatility)
+    initial_value = shares * initial_price + initial_put_cost
+
+    # Terminal day: the puts carry the trigger strike on every path that rolled
+    terminal_strikes = np.where(rolled, trigger_strike, strike)
+    terminal_puts = black_scholes_put(terminal_prices, terminal_strikes, (base.time_horizon - steps + 1) * dt,
+                                      rate, volatility)
+    terminal_values = shares * terminal_prices + contracts * terminal_puts - margin_interest
+
+    # Rolling up swaps the original put for the dearer trigger-strike put at the roll-day price
+    roll_premium = black_scholes_put(roll_prices, trigger_strike, roll_times, rate, volatility) \
+        - black_scholes_put(roll_prices, strike, roll_times, rate, volatility)
+    roll_costs = contracts * np.where(rolled, roll_premium, 0.0)
+
+    expected_value, error = standard_error(terminal_values, block_sizes, variance_reduction)
+    var, es = tail_risk(initial_value - terminal_values, confidence)
+    roll_cost = roll_costs.mean(axis=1)
+    return {
+        'Expected Value': expected_value,
+        'Std Error': error,
+        'Confidence': confidence,
+        'VaR': var,
+        'ES': es,
+        'Initial Put Cost': initial_put_cost[:, 0],
+        'Roll Cost': roll_cost,
+        'Hedge Cost': initial_put_cost[:, 0] + roll_cost,
+        'Paths Rolled (%)': 100 * np.mean(rolled),
+    }
+
+
+def run_sweep(parameters, grid, n_paths=10_000, seed=42, confidence=0.95, variance_reduction='plain'):
+    """
+    Evaluate every grid point on the same simulated Brownian paths.
+
+    Parameters:
+    parameters (Parameters): Base parameter set; fields missing from the grid take their values from it.
+    grid (DataFrame or list of dicts): One row per grid point, columns named after Parameters fields
+                                       (see sweep_grid for Cartesian grids).
+    n_paths (int): Simulated paths shared by every grid point.
+    seed (int): Seed of the shared paths; the same seed reproduces MonteCarloSimulator(parameters, seed).run().
+    confidence (float): VaR / ES confidence level of the terminal loss.
+    variance_reduction (str): 'plain', 'antithetic' or 'sobol', as in MonteCarloSimulator.
+
+    Returns:
+    DataFrame: The grid columns followed by Expected Value, Std Error, Confidence, VaR, ES, Initial Put Cost,
+               Roll Cost, Hedge Cost and Paths Rolled (%) of each grid point, in grid order.
+    """
+    grid = pd.DataFrame(grid).reset_index(drop=True)
+    unknown = sorted(set(grid.columns) - set(SWEEP_FIELDS))
+    if unknown:
+        raise ValueError(f"Cannot sweep parameter(s): {', '.join(unknown)} (sweepable: {', '.join(SWEEP_FIELDS)})")
+    points = pd.DataFrame({name: grid[name] if name in grid else getattr(parameters, name)
+                           for name in SWEEP_FIELDS}, index=grid.index)
+
+    simulator = MonteCarloSimulator(parameters, seed=seed, variance_reduction=variance_reduction)
+    blocks = simulator.block_seed_sequences(n_paths)
+    brownian = np.concatenate([simulator.simulate_brownian_paths(size, np.random.default_rng(seed_sequence))
+                               for seed_sequence, size in blocks])
+    block_sizes = [size for _, size in blocks]
+    drift_times = simulator.drift_times()
+    chunk_points = max(1, MAX_CHUNK_ELEMENTS // n_paths)
+
+    frames = []
+    for (initial_price, expected_return, volatility), path_points in points.groupby(list(PATH_FIELDS), sort=False):
+        prices = np.exp((expected_return - 0.5 * volatility ** 2) * drift_times + volatility * brownian) \
+            * initial_price
+        terminal_prices = prices[:, -1]
+        for trigger_price, trigger_points in path_points.groupby('trigger_price', sort=False):
+            crossed = prices >= trigger_price
+            rolled = crossed.any(axis=1)
+            roll_days = crossed.argmax(axis=1)
+            roll_prices = prices[np.arange(n_paths), roll_days]
+            roll_times = (parameters.time_horizon - roll_days) * simulator.adjusted_time_step
+            for start in range(0, len(trigger_points), chunk_points):
+                chunk = trigger_points.iloc[start:start + chunk_points]
+                values = _value_points(chunk, terminal_prices, rolled, roll_prices, roll_times, parameters,
+                                       confidence, block_sizes, variance_reduction)
+                frames.append(pd.DataFrame(values, index=chunk.index))
+
+    return pd.concat([grid, pd.concat(frames).sort_index()], axis=1)
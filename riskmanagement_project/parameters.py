@@ -0,0 +1,85 @@
+from dataclasses import dataclass, fields
+
+
+'''
+    ------ PARAMETERS CLASS ------
+    To Save to MEMORY the parameters for the simulation.
+    Step 1: Create a class with dataclass decorator
+    Step 2: Create a class method to take user input
+    Step 3: Create a class method to build an instance from a scenario record (batch runs)
+
+    --> This class be be cross called between programs (main.py re-exports it)
+'''
+
+
+@dataclass
+class Parameters():
+    stock_symbol = None
+    initial_equity_price: float
+    strike_price_PUT: float
+    trigger_price_PUT: float
+    time_horizon: int
+    time_step: int
+    time_horizon_step: int
+    annual_expected_return: float
+    volatility: float
+    risk_free_rate: float
+    trigger_price: float
+    num_shares: int
+    num_puts: int
+    margin_requirement: float
+    margin_rate: float
+
+    @classmethod
+    def from_user_input(cls):
+        """Create an instance by taking inputs from the user."""
+        print("[!] Enter the following parameters:")
+        return cls(
+            initial_equity_price=float(input(" [?] Initial Equity Price (e.g., 40.0): ")),
+            strike_price_PUT=float(input("[?] Strike Price for PUT (e.g., 35.0): ")),
+            trigger_price_PUT=float(input("[?] Trigger Price for PUT (e.g., 40.0): ")),
+            time_horizon=int(input("[?] Time Horizon (Days, e.g., 90): ")),
+            time_step=252,  # Set to 252 (trading days in a year)
+            time_horizon_step=int(input("[?] Time Horizon Step (e.g., 90): ")),
+            annual_expected_return=float(input("[?] Annual Expected Return (e.g., 0.05 for 5%): ")),
+            volatility=float(input("[?] Volatility (e.g., 0.3 for 30%): ")),
+            risk_free_rate=float(input("[?] Risk-Free Rate (e.g., 0.01 for 1%): ")),
+            trigger_price=float(input("[?] Trigger Price (e.g., 42.5): ")),
+            num_shares=int(input("[?] Number of Shares (e.g., 1000): ")),
+            num_puts=int(input("[?] Number of Put Contracts (e.g., 10): ")),
+            margin_requirement=float(input("[?] Margin Requirement (e.g., 0.5 for 50%): ")),
+            margin_rate=float(input("[?] Margin Rate (e.g., 0.05 for 5%): ")),
+        )
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Create an instance from a mapping of field names to values (e.g. one row of a scenario file).
+
+        time_step defaults to 252 and time_horizon_step to time_horizon, as in from_user_input.
+        An optional 'stock_symbol' key is kept on the instance. Values are converted to the field types.
+        """
+        values = dict(values)
+        stock_symbol = values.pop('stock_symbol', None)
+        values.setdefault('time_step', 252)
+        if 'time_horizon' in values:
+            values.setdefault('time_horizon_step', values['time_horizon'])
+
+        field_types = {field.name: field.type for field in fields(cls)}
+        unknown = sorted(set(values) - set(field_types))
+        missing = sorted(set(field_types) - set(values))
+        if unknown:
+            raise ValueError(f"Unknown parameter(s): {', '.join(unknown)}")
+        if missing:
+            raise ValueError(f"Missing parameter(s): {', '.join(missing)}")
+
+        converters = {'float': float, 'int': lambda v: int(float(v))}
+        parameters = cls(**{name: converters[getattr(kind, '__name__', kind)](values[name])
+                            for name, kind in field_types.items()})
+        if stock_symbol:
+            parameters.stock_symbol = stock_symbol
+        return parameters
+
+    def to_dict(self):
+        """Return the simulation fields as a plain dict."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
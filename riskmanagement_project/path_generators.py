@@ -0,0 +1,158 @@
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from parameters import Parameters
+
+
+'''
+    ------ PATH GENERATORS ------
+    Interchangeable stock-price models for OptionSimulator and MonteCarloSimulator. Each generator turns a
+    Parameters instance and an np.random.Generator into an (n_paths x time_horizon_step) price matrix, vectorized
+    across paths, so the put-roll strategy runs unchanged on top of any of them.
+    1. GBMGenerator         - geometric Brownian motion, the original model (constant volatility)
+    2. HestonGenerator      - Heston stochastic variance, full-truncation Euler scheme on the daily grid
+    3. MertonJumpGenerator  - GBM plus lognormal jumps arriving as a Poisson process (Merton jump-diffusion)
+
+    Every generator uses initial_equity_price, annual_expected_return, volatility, time_step and
+    time_horizon_step from the Parameters; model-specific inputs are fields of the generator itself.
+    Column k holds the price after k + 1 daily steps, as in the original GBM simulation. The puts are still
+    priced with Black-Scholes at Parameters.volatility whatever model drives the stock.
+
+    benchmark_generators() measures the throughput of each kernel (python path_generators.py runs it).
+'''
+
+
+@dataclass
+class PathGenerator:
+    name = 'base'
+
+    def simulate(self, parameters, n_paths, rng):
+        """Return an (n_paths x time_horizon_step) matrix of simulated stock prices."""
+        raise NotImplementedError
+
+    def describe(self):
+        """Model name and settings, e.g. for result-cache keys."""
+        return {'model': self.name, **asdict(self)}
+
+
+@dataclass
+class GBMGenerator(PathGenerator):
+    name = 'gbm'
+
+    def simulate(self, parameters, n_paths, rng):
+        dt = 1 / parameters.time_step
+        t = np.linspace(0, parameters.time_horizon * dt, parameters.time_horizon_step)
+        drift = (parameters.annual_expected_return - 0.5 * parameters.volatility ** 2) * t
+
+        # Same operations, in the same order, as MonteCarloSimulator's built-in GBM, so plain draws match it
+        prices = rng.standard_normal(size=(n_paths, parameters.time_horizon_step))
+        np.cumsum(prices, axis=1, out=prices)
+        prices *= np.sqrt(dt)
+        prices *= parameters.volatility
+        prices += drift
+        np.exp(prices, out=prices)
+        prices *= parameters.initial_equity_price
+        return prices
+
+
+@dataclass
+class HestonGenerator(PathGenerator):
+    kappa: float = 2.0          # Mean-reversion speed of the variance
+    theta: float = None         # Long-run variance (defaults to volatility ** 2)
+    xi: float = 0.5             # Volatility of the variance
+    rho: float = -0.7           # Correlation between the price and variance shocks
+    v0: float = None            # Initial variance (defaults to volatility ** 2)
+    name = 'heston'
+
+    def simulate(self, parameters, n_paths, rng):
+        dt = 1 / parameters.time_step
+        theta = parameters.volatility ** 2 if self.theta is None else self.theta
+        variance = np.full(n_paths, parameters.volatility ** 2 if self.v0 is None else self.v0)
+        log_price = np.full(n_paths, np.log(parameters.initial_equity_price))
+        orthogonal = np.sqrt(1 - self.rho ** 2)
+
+        prices = np.empty((n_paths, parameters.time_horizon_step))
+        for step in range(parameters.time_horizon_step):
+            variance_shock, independent_shock = rng.standard_normal(size=(2, n_paths))
+            price_shock = self.rho * variance_shock + orthogonal * independent_shock
+            # Full truncation: negative variance is floored at zero in the drift and diffusion terms
+            positive_variance = np.maximum(variance, 0.0)
+            diffusion = np.sqrt(positive_variance * dt)
+            log_price += (parameters.annual_expected_return - 0.5 * positive_variance) * dt + diffusion * price_shock
+            variance += self.kappa * (theta - positive_variance) * dt + self.xi * diffusion * variance_shock
+            prices[:, step] = log_price
+        np.exp(prices, out=prices)
+        return prices
+
+
+@dataclass
+class MertonJumpGenerator(PathGenerator):
+    jump_intensity: float = 1.0   # Expected jumps per year
+    jump_mean: float = -0.05      # Mean of the log jump size
+    jump_std: float = 0.10        # Standard deviation of the log jump size
+    name = 'merton'
+
+    def simulate(self, parameters, n_paths, rng):
+        dt = 1 / parameters.time_step
+        steps = parameters.time_horizon_step
+        # Compensate the drift so the expected return stays annual_expected_return with jumps
+        mean_jump = np.exp(self.jump_mean + 0.5 * self.jump_std ** 2) - 1
+        drift = (parameters.annual_expected_return - 0.5 * parameters.volatility ** 2
+                 - self.jump_intensity * mean_jump) * dt
+
+        jumps = rng.poisson(self.jump_intensity * dt, size=(n_paths, steps))
+        log_returns = rng.standard_normal(size=(n_paths, steps))
+        log_returns *= parameters.volatility * np.sqrt(dt)
+        log_returns += drift
+        # The sum of N normal log jumps is itself normal (N * mean, N * variance); only days with jumps draw one
+        jump_days = np.nonzero(jumps)
+        counts = jumps[jump_days]
+        log_returns[jump_days] += counts * self.jump_mean \
+            + np.sqrt(counts) * self.jump_std * rng.standard_normal(size=counts.size)
+        np.cumsum(log_returns, axis=1, out=log_returns)
+        np.exp(log_returns, out=log_returns)
+        log_returns *= parameters.initial_equity_price
+        return log_returns
+
+
+PATH_GENERATORS = {generator.name: generator for generator in (GBMGenerator, HestonGenerator, MertonJumpGenerator)}
+
+
+def benchmark_generators(parameters, generators=None, n_paths=100_000, repeats=3, seed=0):
+    """
+    Throughput of each path generator on the given parameters (best of `repeats` runs).
+
+    Returns:
+    DataFrame: Model, Paths, Steps, Seconds, Paths / s and ns per path-step for every generator.
+    """
+    if generators is None:
+        generators = [generator() for generator in PATH_GENERATORS.values()]
+    rows = []
+    for generator in generators:
+        timings = []
+        for _ in range(repeats):
+            rng = np.random.default_rng(seed)
+            start = time.perf_counter()
+            generator.simulate(parameters, n_paths, rng)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        rows.append({
+            'Model': generator.name,
+            'Paths': n_paths,
+            'Steps': parameters.time_horizon_step,
+            'Seconds': best,
+            'Paths / s': n_paths / best,
+            'ns / Path-Step': 1e9 * best / (n_paths * parameters.time_horizon_step),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    example = Parameters(initial_equity_price=40.0, strike_price_PUT=35.0, trigger_price_PUT=40.0, time_horizon=90,
+                         time_step=252, time_horizon_step=90, annual_expected_return=0.05, volatility=0.3,
+                         risk_free_rate=0.01, trigger_price=42.5, num_shares=1000, num_puts=10,
+                         margin_requirement=0.5, margin_rate=0.05)
+    print(benchmark_generators(example).round(2).to_string(index=False))
@@ -0,0 +1,243 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from batch_runner import load_scenarios
+from historical_bootstrap import load_price_history
+from monte_carlo import DEFAULT_BLOCK_SIZE, SUMMARY_PERCENTILES, MonteCarloSimulator, split_blocks, summary_frame
+from parameters import Parameters
+from risk_metrics import risk_report
+
+
+'''
+    ------ PORTFOLIO SIMULATOR ------
+    Multi-name version of MonteCarloSimulator: a book of hedged positions, one Parameters per position.
+    1. estimate_correlation() reads the cached closing prices of every ticker (STOCK_RESULTS, via
+       historical_bootstrap.load_price_history) and estimates the correlation of their daily log returns
+    2. Correlated Brownian paths are drawn for all tickers at once: independent normals times the transposed
+       Cholesky factor of the correlation matrix
+    3. Each position gets its own MonteCarloSimulator: its prices are built from its ticker's Brownian path
+       (prices_from_brownian) and valued by value_hedged_position, so the put-roll rule has one implementation
+    4. The position values are summed into the portfolio value per path and day, so PortfolioResults gives the
+       portfolio P&L distribution, its VaR / ES (risk_metrics.risk_report) and each position's contribution
+
+    The positions must share time_step and time_horizon_step (one simulated calendar). Several positions may
+    hold the same ticker; they then move on the same path. The cached files carry no dates, so histories of
+    different lengths are aligned on their most recent common window.
+'''
+
+MAX_BLOCK_ELEMENTS = 8_000_000  # Positions x paths x days valued at once
+
+
+def estimate_correlation(tickers, directory="STOCK_RESULTS", min_observations=20):
+    """Correlation matrix of the daily log returns of the tickers, from their cached price histories."""
+    histories = [load_price_history(ticker, directory) for ticker in tickers]
+    length = min(history.size for history in histories)
+    if length - 1 < min_observations:
+        raise ValueError(f"Only {length - 1} common daily returns in {directory}; "
+                         f"at least {min_observations} are needed to estimate correlations")
+    returns = np.diff(np.log(np.stack([history[-length:] for history in histories])), axis=1)
+    return np.atleast_2d(np.corrcoef(returns))
+
+
+def cholesky_factor(correlation):
+    """
+    Lower Cholesky factor of a correlation matrix.
+
+    A matrix that is not positive definite (e.g. estimated from fewer days than names) is first replaced by
+    the nearest one with eigenvalues clipped at a small positive floor, rescaled to a unit diagonal.
+    """
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        values, vectors = np.linalg.eigh(correlation)
+        repaired = (vectors * np.maximum(values, 1e-8)) @ vectors.T
+        scale = np.sqrt(np.diag(repaired))
+        return np.linalg.cholesky(repaired / np.outer(scale, scale))
+
+
+def _run_portfolio_block(simulator, seed_sequence, n_paths):
+    """Process-pool entry point: simulate and value one block of portfolio paths."""
+    return simulator.run_block(seed_sequence, n_paths)
+
+
+@dataclass
+class PortfolioResults:
+    names: list                        # Position names
+    tickers: list                      # Ticker of every position
+    portfolio_values: np.ndarray       # (n_paths, time_horizon_step) sum of the position values
+    terminal_values: np.ndarray        # (n_paths, n_positions) terminal value of every position
+    roll_days: np.ndarray              # (n_paths, n_positions) day each position's puts were rolled, -1 if never
+    initial_values: np.ndarray         # (n_positions,) value of every position at inception
+
+    @property
+    def n_paths(self):
+        return self.portfolio_values.shape[0]
+
+    @property
+    def initial_value(self):
+        return float(self.initial_values.sum())
+
+    @property
+    def terminal_pnl(self):
+        """(n_paths,) terminal portfolio P&L."""
+        return self.portfolio_values[:, -1] - self.initial_value
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES):
+        """Distribution of the terminal portfolio value; Paths Rolled (%) counts position-paths."""
+        terminal = self.portfolio_values[:, -1]
+        return summary_frame(
+            self.n_paths, terminal.mean(), terminal.std(ddof=1) if self.n_paths > 1 else 0.0, terminal.min(),
+            np.percentile(terminal, percentiles), terminal.max(), np.mean(self.roll_days >= 0), percentiles)
+
+    def position_summary(self):
+        """Terminal P&L of every position and its share of the portfolio P&L variance."""
+        pnl = self.terminal_values - self.initial_values
+        total = pnl.sum(axis=1)
+        centred = total - total.mean()
+        variance = centred @ centred
+        contribution = (pnl - pnl.mean(axis=0)).T @ centred / variance if variance > 0 \
+            else np.zeros(len(self.names))
+        return pd.DataFrame({
+            'Position': self.names,
+            'Ticker': self.tickers,
+            'Initial Value': self.initial_values,
+            'Mean P&L': pnl.mean(axis=0),
+            'Std P&L': pnl.std(axis=0, ddof=1) if self.n_paths > 1 else 0.0,
+            'P5 P&L': np.percentile(pnl, 5, axis=0),
+            'Paths Rolled (%)': 100 * np.mean(self.roll_days >= 0, axis=0),
+            'Variance Contribution (%)': 100 * contribution,
+        })
+
+    def risk_report(self, confidence_levels=(0.95, 0.99), horizons=None, **kwargs):
+        """VaR / ES of the portfolio value; horizons default to 1 day, 10 days and the full horizon."""
+        steps = self.portfolio_values.shape[1]
+        if horizons is None:
+            horizons = sorted({1, min(10, steps), steps})
+        return risk_report(self.portfolio_values, self.initial_value, confidence_levels=confidence_levels,
+                           horizons=horizons, **kwargs)
+
+    @classmethod
+    def concatenate(cls, blocks):
+        first = blocks[0]
+        return cls(names=first.names, tickers=first.tickers,
+                   portfolio_values=np.concatenate([block.portfolio_values for block in blocks]),
+                   terminal_values=np.concatenate([block.terminal_values for block in blocks]),
+                   roll_days=np.concatenate([block.roll_days for block in blocks]),
+                   initial_values=first.initial_values)
+
+
+class PortfolioSimulator:
+    def __init__(self, positions, names=None, correlation=None, seed=42, block_size=DEFAULT_BLOCK_SIZE,
+                 directory="STOCK_RESULTS"):
+        """
+        Parameters:
+        positions (list of Parameters): One hedged position each; stock_symbol names its ticker.
+        names (list of str): Position names (default "<index>:<ticker>").
+        correlation (array): Correlation matrix of the distinct tickers in order of first appearance;
+                             None estimates it from the cached histories in directory.
+        seed (int): Seed of the path blocks (None varies across runs).
+        block_size (int): Paths per block, capped so one block holds at most MAX_BLOCK_ELEMENTS values.
+        """
+        if not positions:
+            raise ValueError("A portfolio needs at least one position")
+        if any(position.stock_symbol is None for position in positions):
+            raise ValueError("Every position needs a stock_symbol to look up its price history")
+        calendars = {(position.time_step, position.time_horizon_step) for position in positions}
+        if len(calendars) > 1:
+            raise ValueError("All positions must share time_step and time_horizon_step")
+
+        self.positions = list(positions)
+        self.names = list(names) if names is not None else \
+            [f"{index}:{position.stock_symbol}" for index, position in enumerate(self.positions)]
+        self.tickers = list(dict.fromkeys(position.stock_symbol for position in self.positions))
+        self.ticker_index = np.array([self.tickers.index(position.stock_symbol) for position in self.positions])
+        self.correlation = estimate_correlation(self.tickers, directory) if correlation is None \
+            else np.asarray(correlation, dtype=float)
+        if self.correlation.shape != (len(self.tickers), len(self.tickers)):
+            raise ValueError(f"Correlation matrix must be {len(self.tickers)} x {len(self.tickers)} "
+                             f"(tickers: {', '.join(self.tickers)})")
+        self.cholesky = cholesky_factor(self.correlation)
+
+        self.time_step, self.steps = calendars.pop()
+        self.simulators = [MonteCarloSimulator(position) for position in self.positions]
+        self.adjusted_time_step = 1 / self.time_step
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.block_size = max(1, min(block_size, MAX_BLOCK_ELEMENTS // (len(self.positions) * self.steps)))
+
+    @classmethod
+    def from_book(cls, path, **kwargs):
+        """Build the portfolio from a scenario file (see batch_runner.load_scenarios), one position per record."""
+        positions, names = [], []
+        for record in load_scenarios(path):
+            record = {key: value for key, value in record.items() if key not in ('n_paths', 'seed')}
+            names.append(str(record.pop('scenario')))
+            positions.append(Parameters.from_dict(record))
+        return cls(positions, names=names, **kwargs)
+
+    def initial_position_values(self):
+        """Shares plus initial puts of every position at inception."""
+        return np.array([simulator.initial_position_value() for simulator in self.simulators], dtype=float)
+
+    def simulate_stock_price_paths(self, n_paths, rng):
+        """(n_positions, n_paths, time_horizon_step) prices, correlated across tickers."""
+        normals = rng.standard_normal(size=(n_paths, self.steps, len(self.tickers)))
+        brownian = normals @ self.cholesky.T
+        np.cumsum(brownian, axis=1, out=brownian)
+        brownian *= np.sqrt(self.adjusted_time_step)
+        # One Brownian path per ticker, shared by every position on that ticker (the fancy index copies it)
+        prices = np.moveaxis(brownian, 2, 0)[self.ticker_index]
+        for simulator, position_prices in zip(self.simulators, prices):
+            simulator.prices_from_brownian(position_prices)
+        return prices
+
+    def value_positions(self, stock_prices):
+        """
+        Apply the put-roll strategy of MonteCarloSimulator.value_hedged_position to every position at once.
+
+        Returns:
+        tuple: (n_positions, n_paths, days) position values and (n_positions, n_paths) roll days.
+        """
+        position_values = np.empty(stock_prices.shape)
+        roll_days = np.empty(stock_prices.shape[:2], dtype=int)
+        for index, simulator in enumerate(self.simulators):
+            results = simulator.value_hedged_position(stock_prices[index])
+            position_values[index] = results.position_values
+            roll_days[index] = results.roll_days
+        return position_values, roll_days
+
+    def block_seed_sequences(self, n_paths):
+        sizes = split_blocks(n_paths, self.block_size)
+        children = np.random.SeedSequence(self.seed_sequence.entropy).spawn(len(sizes))
+        return list(zip(children, sizes))
+
+    def run_block(self, seed_sequence, n_paths):
+        position_values, roll_days = self.value_positions(
+            self.simulate_stock_price_paths(n_paths, np.random.default_rng(seed_sequence)))
+        return PortfolioResults(names=self.names, tickers=[position.stock_symbol for position in self.positions],
+                                portfolio_values=position_values.sum(axis=0),
+                                terminal_values=position_values[:, :, -1].T.copy(),
+                                roll_days=roll_days.T.copy(), initial_values=self.initial_position_values())
+
+    def run(self, n_paths, max_workers=1):
+        """
+        Simulate n_paths correlated scenarios for the whole book.
+
+        Parameters:
+        n_paths (int): Number of simulated paths.
+        max_workers (int): Worker processes for the path blocks; 1 runs in-process, None uses every CPU.
+                           Results are identical for any worker count.
+
+        Returns:
+        PortfolioResults
+        """
+        blocks = self.block_seed_sequences(n_paths)
+        if max_workers == 1 or len(blocks) == 1:
+            results = [self.run_block(seed_sequence, size) for seed_sequence, size in blocks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_run_portfolio_block, [self] * len(blocks),
+                                            *zip(*blocks)))
+        return PortfolioResults.concatenate(results)
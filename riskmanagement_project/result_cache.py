@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    ------ RESULT CACHE ------
+    Disk-backed, content-addressed store for simulation results, so identical runs are loaded instead of
+    re-simulated.
+    1. cache_key() hashes everything that determines the output (parameters, seed, path count, engine options
+       and the engine version) into a stable SHA-256 key
+    2. Entries are uncompressed .npz files named after their key; loading one is a single read of raw arrays
+    3. Reading an entry refreshes its modification time, and put() evicts the least recently used entries
+       once the cache grows past max_bytes / max_entries
+
+    Writes go to a temporary file that is renamed into place, so a crashed run never leaves a half-written entry.
+'''
+
+DEFAULT_CACHE_DIR = os.path.join("BLACK_SCHOLES_RESULTS", "cache")
+
+
+def cache_key(**inputs):
+    """Stable hex digest of the keyword inputs (JSON-serialisable values; NumPy scalars are converted)."""
+    payload = json.dumps(inputs, sort_keys=True, default=lambda value: value.item())
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=1_000_000_000, max_entries=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Return the dict of arrays stored under key, or None on a miss."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            logger.debug(f"[!] Cache miss {key[:12]}")
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (ValueError, OSError) as e:
+            logger.warning(f"[-] Discarding unreadable cache entry {path}: {e}")
+            self.discard(key)
+            return None
+        os.utime(path)  # Mark as recently used for LRU eviction
+        logger.info(f"[!] Loaded cached results {key[:12]} from {path}")
+        return arrays
+
+    def put(self, key, arrays):
+        """Store a dict of arrays under key, then evict old entries if the cache is over its limits."""
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temporary_path, self.path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        logger.debug(f"[!] Cached results {key[:12]} to {self.path(key)}")
+        self.evict()
+
+    def discard(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        """(path, size, last used) of every entry, least recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((os.path.join(self.directory, name), stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes and max_entries."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or (self.max_entries is not None
+                                                      and len(entries) > self.max_entries)):
+            path, size, _ = entries.pop(0)
+            os.remove(path)
+            total -= size
+            logger.debug(f"[!] Evicted cache entry {path}")
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
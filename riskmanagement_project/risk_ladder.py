@@ -0,0 +1,104 @@
+import datetime
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from monte_carlo import MonteCarloSimulator
+from result_cache import ResultCache, cache_key
+
+
+'''
+    ------ RISK LADDER ------
+    Spot x volatility revaluation grid of the hedged position (shares + puts - margin interest), the table to
+    check before a trade instead of editing Parameters and re-running main.py.
+    1. Spot shocks (relative, e.g. -30%..+30%) and volatility shocks (additive vol points, e.g. -20..+20) form
+       a grid; the shocked spots are a row vector and the shocked volatilities a column vector
+    2. The puts on the whole grid are priced with one broadcasted MonteCarloSimulator.price_puts call, so the
+       option style and the volatility surface (shocks are then added to the smile) apply as in the simulations
+    3. The P&L matrix (rows = volatility shock, columns = spot shock) is cached per position, valuation date and
+       grid in a ResultCache and can be drawn directly with plot_risk_ladder()
+
+    Volatilities are floored at MIN_VOLATILITY so large negative shocks stay priceable.
+'''
+
+DEFAULT_LADDER_DIR = os.path.join("BLACK_SCHOLES_RESULTS", "risk_ladders")
+DEFAULT_SPOT_SHOCKS = np.round(np.linspace(-0.30, 0.30, 61), 4)
+DEFAULT_VOL_SHOCKS = np.round(np.linspace(-0.20, 0.20, 41), 4)
+MIN_VOLATILITY = 0.01
+
+
+def risk_ladder(parameters, spot_shocks=DEFAULT_SPOT_SHOCKS, vol_shocks=DEFAULT_VOL_SHOCKS, day=0, put_strike=None,
+                equity_price=None, valuation_date=None, cache=None, **simulator_kwargs):
+    """
+    Revalue the hedged position on a spot x volatility shock grid.
+
+    Parameters:
+    parameters (Parameters): The position.
+    spot_shocks (array): Relative spot moves, e.g. -0.3 for -30%.
+    vol_shocks (array): Additive volatility moves, e.g. 0.05 for +5 vol points.
+    day (int): Day of the horizon being revalued (sets the puts' time to expiration and the accrued interest).
+    put_strike (float): Strike of the puts held (default strike_price_PUT; trigger_price_PUT after a roll).
+    equity_price (float): Unshocked stock price (default initial_equity_price).
+    valuation_date (str): YYYY-MM-DD, part of the cache key (default today).
+    cache (ResultCache): Cache of ladders; None uses DEFAULT_LADDER_DIR, False disables caching.
+    **simulator_kwargs: option_style, volatility_surface, as in MonteCarloSimulator.
+
+    Returns:
+    DataFrame: P&L against the unshocked position value; index 'Vol Shock', columns 'Spot Shock'.
+    """
+    spot_shocks = np.asarray(spot_shocks, dtype=float)
+    vol_shocks = np.asarray(vol_shocks, dtype=float)
+    put_strike = parameters.strike_price_PUT if put_strike is None else put_strike
+    equity_price = parameters.initial_equity_price if equity_price is None else equity_price
+    simulator = MonteCarloSimulator(parameters, **simulator_kwargs)
+
+    if cache is None:
+        cache = ResultCache(DEFAULT_LADDER_DIR)
+    key = cache_key(kind='risk_ladder', parameters=parameters.to_dict(), stock_symbol=parameters.stock_symbol,
+                    valuation_date=valuation_date or datetime.date.today().isoformat(), day=day,
+                    put_strike=put_strike, equity_price=equity_price, spot_shocks=spot_shocks.tolist(),
+                    vol_shocks=vol_shocks.tolist(), option_style=simulator.option_style,
+                    volatility_surface=None if simulator.volatility_surface is None
+                    else simulator.volatility_surface.describe())
+    arrays = cache.get(key) if cache else None
+    if arrays is None:
+        arrays = {'pnl': _revalue(simulator, spot_shocks, vol_shocks, day, put_strike, equity_price)}
+        if cache:
+            cache.put(key, arrays)
+
+    return pd.DataFrame(arrays['pnl'], index=pd.Index(vol_shocks, name='Vol Shock'),
+                        columns=pd.Index(spot_shocks, name='Spot Shock'))
+
+
+def _revalue(simulator, spot_shocks, vol_shocks, day, put_strike, equity_price):
+    """(n_vol, n_spot) P&L matrix; the unshocked point is priced in the same call as the grid."""
+    parameters = simulator.parameters
+    time_to_expiration = (parameters.time_horizon - day) * simulator.adjusted_time_step
+    spots = equity_price * (1 + np.append(spot_shocks, 0.0))[np.newaxis, :]
+    shocks = np.append(vol_shocks, 0.0)[:, np.newaxis]
+    volatility = np.maximum(simulator.put_volatility(spots, put_strike, time_to_expiration) + shocks,
+                            MIN_VOLATILITY)
+
+    puts = simulator.price_puts(spots, put_strike, time_to_expiration, volatility=volatility)
+    margin_interest = simulator.borrowed_amount * simulator.daily_margin_rate * (day + 1)
+    values = parameters.num_shares * spots + parameters.num_puts * 100 * puts - margin_interest
+    return values[:-1, :-1] - values[-1, -1]
+
+
+def plot_risk_ladder(ladder, output_file=None, title="Position P&L: Spot x Volatility Shocks"):
+    """Heatmap of a risk_ladder() matrix; saved to output_file when given."""
+    figure, axis = plt.subplots(figsize=(12, 6))
+    spot_shocks, vol_shocks = ladder.columns.to_numpy(), ladder.index.to_numpy()
+    limit = np.abs(ladder.to_numpy()).max()
+    image = axis.imshow(ladder.to_numpy(), origin='lower', aspect='auto', cmap='RdYlGn', vmin=-limit, vmax=limit,
+                        extent=[100 * spot_shocks[0], 100 * spot_shocks[-1], 100 * vol_shocks[0],
+                                100 * vol_shocks[-1]])
+    figure.colorbar(image, ax=axis, label='P&L ($)')
+    axis.set_xlabel('Spot Shock (%)')
+    axis.set_ylabel('Volatility Shock (vol points)')
+    axis.set_title(title)
+    if output_file:
+        figure.savefig(output_file)
+    return figure
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+
+'''
+    ------ RISK METRICS ------
+    Value-at-Risk and Expected Shortfall (CVaR) of the hedged position, computed straight from the simulated
+    (n_paths x time_horizon_step) position-value array.
+    1. Losses at each horizon are sorted once; every confidence level is read off the same sorted array
+    2. Bootstrap confidence intervals re-weight the sorted losses with resampling counts, so no resample
+       is ever re-sorted
+    3. risk_report() lays the numbers out as one table per horizon and confidence level
+
+    Conventions: loss = initial position value - position value at the horizon (positive = money lost).
+    With m = ceil((1 - confidence) * n_paths) worst losses, VaR is the smallest of them and ES is their mean.
+'''
+
+
+def _tail_size(n_paths, confidence):
+    return max(1, int(np.ceil((1 - confidence) * n_paths - 1e-9)))
+
+
+def value_at_risk(losses, confidence=0.95):
+    """VaR of a 1-D array of losses at the given confidence level."""
+    losses = np.sort(np.asarray(losses, dtype=float))[::-1]
+    return losses[_tail_size(losses.size, confidence) - 1]
+
+
+def expected_shortfall(losses, confidence=0.95):
+    """Expected Shortfall (CVaR): mean of the worst (1 - confidence) share of a 1-D array of losses."""
+    losses = np.sort(np.asarray(losses, dtype=float))[::-1]
+    return losses[:_tail_size(losses.size, confidence)].mean()
+
+
+def tail_risk(losses, confidence=0.95):
+    """VaR and ES of every row of a (k, n_paths) loss array, using a partial sort instead of a full one."""
+    losses = np.asarray(losses, dtype=float)
+    n_paths = losses.shape[-1]
+    m = _tail_size(n_paths, confidence)
+    tail = np.partition(losses, n_paths - m, axis=-1)[..., n_paths - m:]
+    return tail.min(axis=-1), tail.mean(axis=-1)
+
+
+def value_at_risk_standard_error(losses, confidence=0.95):
+    """
+    VaR of a 1-D array of losses and its distribution-free standard error.
+
+    The VaR order statistic moves by about sqrt(n p (1 - p)) ranks between samples, so half the spread of the
+    losses that far either side of it estimates the standard error without a density estimate or a bootstrap.
+    Assumes independent paths.
+    """
+    losses = np.asarray(losses, dtype=float)
+    n_paths = losses.size
+    rank = n_paths - _tail_size(n_paths, confidence)
+    spread = int(np.ceil(np.sqrt(n_paths * confidence * (1 - confidence))))
+    lower, upper = max(rank - spread, 0), min(rank + spread, n_paths - 1)
+    ordered = np.partition(losses, [lower, rank, upper])
+    # Near the end of the sample the bracket is one-sided; rescale it to the same number of ranks
+    return ordered[rank], (ordered[upper] - ordered[lower]) * spread / max(upper - lower, 1)
+
+
+def _weighted_tail(descending_losses, counts, confidence, n_paths=None):
+    """
+    VaR and ES for each row of resampling counts over losses sorted in descending order.
+
+    counts (B, k) gives how often each of the k worst losses appears in each of B resamples of n_paths
+    draws. k may be cut short of n_paths as long as every row's counts cover the resampled tail.
+    """
+    n = descending_losses.size if n_paths is None else n_paths
+    m = _tail_size(n, confidence)
+    cumulative_counts = np.cumsum(counts, axis=1)
+    cumulative_losses = np.cumsum(counts * descending_losses[:counts.shape[1]], axis=1)
+
+    # First position where the m worst resampled losses are covered
+    j = np.argmax(cumulative_counts >= m, axis=1)
+    rows = np.arange(counts.shape[0])
+    var = descending_losses[j]
+    tail_sum = cumulative_losses[rows, j] + (m - cumulative_counts[rows, j]) * var
+    return var, tail_sum / m
+
+
+def risk_report(position_values, initial_value, confidence_levels=(0.95, 0.99), horizons=None,
+                n_bootstrap=500, ci_level=0.95, seed=0, chunk_size=50):
+    """
+    VaR / ES table for the simulated position values.
+
+    Parameters:
+    position_values (array): (n_paths, n_steps) total position value per path and day.
+    initial_value (float): Position value at inception, the reference for P&L.
+    confidence_levels (sequence): VaR / ES confidence levels, e.g. (0.95, 0.99).
+    horizons (sequence): Horizons in days (1 = after the first simulated day). Defaults to the full horizon.
+    n_bootstrap (int): Bootstrap resamples for the confidence intervals, 0 to skip them.
+    ci_level (float): Coverage of the bootstrap percentile intervals.
+    seed (int): Seed of the bootstrap resampling.
+    chunk_size (int): Resamples processed at once (bounds memory at chunk_size x n_paths counts).
+
+    Returns:
+    DataFrame: One row per horizon and confidence level.
+    """
+    position_values = np.asarray(position_values, dtype=float)
+    if position_values.ndim == 1:
+        position_values = position_values[:, np.newaxis]
+    n_paths, n_steps = position_values.shape
+    if horizons is None:
+        horizons = (n_steps,)
+    horizons = [min(int(h), n_steps) for h in horizons]
+
+    # Losses for every horizon, each column sorted once (descending: worst first)
+    losses = initial_value - position_values[:, [h - 1 for h in horizons]]
+    order = np.argsort(-losses, axis=0, kind='stable')
+    sorted_losses = np.take_along_axis(losses, order, axis=0)
+
+    boot = {(h, c): ([], []) for h in range(len(horizons)) for c in confidence_levels}
+    # A resample's tail is drawn almost entirely from the worst ~m original paths, so only the worst
+    # 2m + 100 are scanned; rows whose counts fall short of m there are redone on the full array.
+    m_max = max(_tail_size(n_paths, c) for c in confidence_levels)
+    scan = min(n_paths, 2 * m_max + 100)
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_bootstrap, chunk_size):
+        size = min(chunk_size, n_bootstrap - start)
+        # Resampling counts per path, shared by every horizon so the resamples stay jointly consistent
+        draws = rng.integers(0, n_paths, size=(size, n_paths)) + n_paths * np.arange(size)[:, np.newaxis]
+        counts = np.bincount(draws.ravel(), minlength=size * n_paths).reshape(size, n_paths)
+        for h in range(len(horizons)):
+            horizon_counts = counts[:, order[:scan, h]]
+            short = horizon_counts.sum(axis=1) < m_max
+            if short.any():
+                horizon_counts = counts[:, order[:, h]]
+            for confidence in confidence_levels:
+                var, es = _weighted_tail(sorted_losses[:, h], horizon_counts, confidence, n_paths)
+                boot[h, confidence][0].append(var)
+                boot[h, confidence][1].append(es)
+
+    lower_q, upper_q = 50 * (1 - ci_level), 50 * (1 + ci_level)
+    rows = []
+    for h, horizon in enumerate(horizons):
+        for confidence in confidence_levels:
+            m = _tail_size(n_paths, confidence)
+            row = {
+                'Horizon (Days)': horizon,
+                'Confidence': confidence,
+                'Mean P&L': -losses[:, h].mean(),
+                'VaR': sorted_losses[m - 1, h],
+                'ES': sorted_losses[:m, h].mean(),
+            }
+            if n_bootstrap:
+                var_samples = np.concatenate(boot[h, confidence][0])
+                es_samples = np.concatenate(boot[h, confidence][1])
+                row['VaR CI Low'], row['VaR CI High'] = np.percentile(var_samples, [lower_q, upper_q])
+                row['ES CI Low'], row['ES CI High'] = np.percentile(es_samples, [lower_q, upper_q])
+            rows.append(row)
+    return pd.DataFrame(rows)
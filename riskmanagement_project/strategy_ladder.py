@@ -0,0 +1,192 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from monte_carlo import MonteCarloSimulator
+from risk_metrics import tail_risk
+
+
+'''
+    ------ TRIGGER LADDER STRATEGIES ------
+    Generalises the single roll of OptionSimulator.run_simulation (strike_price_PUT -> trigger_price_PUT once
+    trigger_price is hit) to a ladder of rungs, roll-downs and expiry re-buys.
+    1. Each Rung has a trigger price, the put strike held while it is active and an optional reset price.
+       A rung switches on the first day the stock reaches its trigger (roll up) and off the first day the stock
+       falls to its reset price (roll back down to the rung below)
+    2. Every rung is compiled into a two-state relay evaluated on all paths and days at once: it is on at day t
+       when its last trigger day up to t is later than its last reset day, both found with
+       np.maximum.accumulate. Triggers and resets both rise with the rung, so active rungs are always the
+       lowest ones and the ladder level is simply the number of rungs that are on
+    3. put_tenor buys puts of that many days and re-buys one at the current rung's strike when it expires;
+       without it the puts run to time_horizon as in the original strategy
+    4. Every roll or re-buy sells the held put and buys the new one at that day's prices; the difference goes
+       to a cash account, so (unlike value_hedged_position) the position value is net of every premium paid
+
+    compare_ladders() values several designs on the same simulated paths (common random numbers).
+'''
+
+
+@dataclass
+class Rung:
+    trigger_price: float       # Roll up to this rung on the first day the stock reaches trigger_price
+    strike: float              # Put strike held while this is the highest active rung
+    reset_price: float = None  # Roll down to the rung below when the stock falls to reset_price (None: never)
+
+
+@dataclass
+class LadderStrategy:
+    rungs: list                # Rungs in increasing trigger order
+    put_tenor: int = None      # Days to expiry of every put bought; None = one put expiring at time_horizon
+    name: str = 'ladder'
+
+    def __post_init__(self):
+        triggers = np.array([rung.trigger_price for rung in self.rungs], dtype=float)
+        resets = self.reset_prices()
+        if np.any(np.diff(triggers) <= 0):
+            raise ValueError("Rung trigger prices must be strictly increasing")
+        if np.any(resets[1:] < resets[:-1]):
+            raise ValueError("Rung reset prices must not decrease up the ladder (rungs without one come first)")
+        if np.any(resets >= triggers):
+            raise ValueError("A rung's reset price must be below its trigger price")
+        if self.put_tenor is not None and self.put_tenor < 1:
+            raise ValueError("put_tenor must be at least one day")
+
+    @classmethod
+    def from_parameters(cls, parameters, **kwargs):
+        """The original single-roll strategy of run_simulation."""
+        return cls(rungs=[Rung(parameters.trigger_price, parameters.trigger_price_PUT)], **kwargs)
+
+    def reset_prices(self):
+        return np.array([-np.inf if rung.reset_price is None else rung.reset_price for rung in self.rungs])
+
+    def strikes(self, parameters):
+        """Put strike of every ladder level (level 0 = strike_price_PUT)."""
+        return np.array([parameters.strike_price_PUT] + [rung.strike for rung in self.rungs], dtype=float)
+
+    def levels(self, stock_prices):
+        """(n_paths, days) ladder level: the number of active rungs on each day."""
+        days = np.arange(stock_prices.shape[1])
+        levels = np.zeros(stock_prices.shape, dtype=np.int8)
+        for rung, reset_price in zip(self.rungs, self.reset_prices()):
+            last_trigger = np.maximum.accumulate(np.where(stock_prices >= rung.trigger_price, days, -1), axis=1)
+            last_reset = np.maximum.accumulate(np.where(stock_prices <= reset_price, days, -1), axis=1)
+            levels += last_trigger > last_reset
+        return levels
+
+    def expiry_days(self, parameters, steps):
+        """(steps,) expiry day of the put held at the end of each day, and the expiry of the initial put."""
+        days = np.arange(steps)
+        if self.put_tenor is None:
+            return np.full(steps, parameters.time_horizon), parameters.time_horizon
+        return self.put_tenor * (days // self.put_tenor + 1), self.put_tenor
+
+
+@dataclass
+class LadderResults:
+    levels: np.ndarray              # (n_paths, days) active rungs
+    put_strike_prices: np.ndarray   # (n_paths, days)
+    put_option_values: np.ndarray   # (n_paths, days) value of the puts held
+    cash: np.ndarray                # (n_paths, days) cumulative cash from rolls and re-buys (negative = paid)
+    position_values: np.ndarray     # (n_paths, days) shares + puts + cash - margin interest
+    initial_value: float
+    n_rolls: np.ndarray             # (n_paths,) rung changes
+    n_rebuys: np.ndarray            # (n_paths,) expiry re-buys
+
+    @property
+    def terminal_position_values(self):
+        return self.position_values[:, -1]
+
+    def summary(self, confidence=0.95):
+        """Terminal value distribution, tail risk and hedging activity."""
+        terminal = self.terminal_position_values
+        var, es = tail_risk(self.initial_value - terminal, confidence)
+        return {
+            'Mean Terminal Value': terminal.mean(),
+            'Std Dev': terminal.std(ddof=1) if terminal.size > 1 else 0.0,
+            'P5': np.percentile(terminal, 5),
+            'VaR': var,
+            'ES': es,
+            'Mean Net Premium': -self.cash[:, -1].mean(),
+            'Mean Rolls': self.n_rolls.mean(),
+            'Paths Rolled (%)': 100 * np.mean(self.n_rolls > 0),
+            'Re-buys': self.n_rebuys.mean(),
+        }
+
+
+def run_ladder(parameters, strategy, stock_prices, simulator=None):
+    """
+    Value a ladder strategy on a matrix of stock prices.
+
+    Parameters:
+    parameters (Parameters): Position and pricing inputs (the rungs replace trigger_price / trigger_price_PUT).
+    strategy (LadderStrategy): Rungs and put tenor.
+    stock_prices (array): (n_paths, time_horizon_step) prices, e.g. from simulate_stock_price_paths.
+    simulator (MonteCarloSimulator): Prices the puts (option style, volatility surface); default Black-Scholes.
+
+    Returns:
+    LadderResults
+    """
+    simulator = simulator or MonteCarloSimulator(parameters)
+    n_paths, steps = stock_prices.shape
+    days = np.arange(steps)
+    contracts = parameters.num_puts * 100
+    strikes = strategy.strikes(parameters)
+
+    levels = strategy.levels(stock_prices)
+    expiry, initial_expiry = strategy.expiry_days(parameters, steps)
+    put_strike_prices = strikes[levels]
+    put_option_values = contracts * simulator.price_puts(stock_prices, put_strike_prices,
+                                                         (expiry - days) * simulator.adjusted_time_step)
+
+    # A trade happens when the rung or the expiry changes from the previous day: the old put is sold at today's
+    # price and the new one bought
+    previous_levels = np.column_stack([np.zeros(n_paths, dtype=levels.dtype), levels[:, :-1]])
+    previous_expiry = np.concatenate([[initial_expiry], expiry[:-1]])
+    rolled = levels != previous_levels
+    rebought = expiry != previous_expiry
+    traded = rolled | rebought[np.newaxis, :]
+    paths, trade_days = np.nonzero(traded)
+    old_values = contracts * simulator.price_puts(
+        stock_prices[paths, trade_days], strikes[previous_levels[paths, trade_days]],
+        (previous_expiry[trade_days] - trade_days) * simulator.adjusted_time_step)
+    cash_flows = np.zeros(stock_prices.shape)
+    cash_flows[paths, trade_days] = old_values - put_option_values[paths, trade_days]
+    cash = np.cumsum(cash_flows, axis=1)
+
+    margin_interest = simulator.borrowed_amount * simulator.daily_margin_rate * (days + 1)
+    position_values = parameters.num_shares * stock_prices + put_option_values + cash - margin_interest
+    initial_value = parameters.num_shares * parameters.initial_equity_price + contracts * simulator.price_puts(
+        parameters.initial_equity_price, parameters.strike_price_PUT, initial_expiry * simulator.adjusted_time_step)
+    return LadderResults(levels=levels, put_strike_prices=put_strike_prices, put_option_values=put_option_values,
+                         cash=cash, position_values=position_values, initial_value=float(initial_value),
+                         n_rolls=np.count_nonzero(rolled, axis=1), n_rebuys=np.full(n_paths, rebought.sum()))
+
+
+def compare_ladders(parameters, strategies, n_paths=100_000, seed=42, confidence=0.95, **simulator_kwargs):
+    """
+    Value several ladder designs on the same simulated paths.
+
+    Parameters:
+    parameters (Parameters): Position, pricing and simulation inputs.
+    strategies (list of LadderStrategy): Designs to compare (named by their name field).
+    n_paths (int): Simulated paths shared by every design.
+    seed (int): Seed of the paths; the same seed reproduces MonteCarloSimulator(parameters, seed).run().
+    confidence (float): VaR / ES confidence level of the terminal loss.
+    **simulator_kwargs: Passed to MonteCarloSimulator (variance_reduction, path_generator, option_style, ...).
+
+    Returns:
+    DataFrame: One row per design with its summary() statistics and valuation time.
+    """
+    simulator = MonteCarloSimulator(parameters, seed=seed, **simulator_kwargs)
+    stock_prices = np.concatenate([simulator.simulate_stock_price_paths(size, np.random.default_rng(seed_sequence))
+                                   for seed_sequence, size in simulator.block_seed_sequences(n_paths)])
+    rows = []
+    for strategy in strategies:
+        start = time.perf_counter()
+        results = run_ladder(parameters, strategy, stock_prices, simulator)
+        rows.append({'Strategy': strategy.name, **results.summary(confidence),
+                     'Seconds': time.perf_counter() - start})
+        del results
+    return pd.DataFrame(rows)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+
+'''
+    ------ STREAMING STATISTICS ------
+    Online accumulators used by the streaming Monte Carlo mode. Each one is updated one block of
+    simulated paths at a time and keeps a fixed amount of state, so memory does not grow with the path count.
+    1. RunningMoments    - mean and variance (Welford, blocks combined with Chan's parallel formula)
+    2. StreamingHistogram - fixed number of bins with an auto-expanding range, used as a quantile sketch
+'''
+
+
+class RunningMoments:
+    """Running count, mean and variance over the first axis of the blocks passed to update()."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+
+    def update(self, values):
+        """Fold a block of observations (n, ...) into the running moments."""
+        values = np.asarray(values, dtype=float)
+        n = values.shape[0]
+        if n == 0:
+            return self
+        block_mean = values.mean(axis=0)
+        block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+        return self._combine(n, block_mean, block_m2)
+
+    def merge(self, other):
+        """Fold another RunningMoments into this one."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else self.m2 * 0.0
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class StreamingHistogram:
+    """
+    Histogram with a fixed number of equal-width bins whose range grows to cover all values seen.
+
+    When a value falls outside the current range, the range doubles and adjacent bins are merged pairwise,
+    so memory stays at n_bins counts. Quantiles are interpolated inside a bin and are therefore accurate
+    to within one bin width.
+    """
+
+    def __init__(self, n_bins=10_000):
+        if n_bins % 2:
+            raise ValueError("n_bins must be even")
+        self.n_bins = n_bins
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.lower = None
+        self.width = None
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def upper(self):
+        return self.lower + self.width * self.n_bins
+
+    def update(self, values):
+        """Add a block of values to the histogram."""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        block_min, block_max = values.min(), values.max()
+
+        if self.lower is None:
+            # Size the first range from the first block, padded so later blocks rarely force a re-bin
+            span = max(block_max - block_min, abs(block_max) * 1e-9, 1e-9)
+            self.lower = block_min - 0.5 * span
+            self.width = 2 * span / self.n_bins
+
+        while block_min < self.lower:
+            self._double_range(extend_down=True)
+        while block_max >= self.upper:
+            self._double_range(extend_down=False)
+
+        bins = ((values - self.lower) / self.width).astype(np.int64)
+        np.clip(bins, 0, self.n_bins - 1, out=bins)
+        self.counts += np.bincount(bins, minlength=self.n_bins)
+        self.count += values.size
+        self.min = min(self.min, block_min)
+        self.max = max(self.max, block_max)
+        return self
+
+    def _double_range(self, extend_down):
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        padding = np.zeros(self.n_bins // 2, dtype=np.int64)
+        if extend_down:
+            self.counts = np.concatenate([padding, merged])
+            self.lower -= self.width * self.n_bins
+        else:
+            self.counts = np.concatenate([merged, padding])
+        self.width *= 2
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1], linearly interpolated within a bin."""
+        q = np.asarray(q, dtype=float)
+        cumulative = np.cumsum(self.counts)
+        target = q * self.count
+        index = np.clip(np.searchsorted(cumulative, target, side='left'), 0, self.n_bins - 1)
+        below = np.where(index > 0, cumulative[index - 1], 0)
+        in_bin = np.maximum(self.counts[index], 1)
+        estimate = self.lower + self.width * (index + np.clip((target - below) / in_bin, 0, 1))
+        return np.clip(estimate, self.min, self.max)
+
+    def percentile(self, percentiles):
+        return self.quantile(np.asarray(percentiles, dtype=float) / 100)
+
+    def to_frame(self, n_bins=100):
+        """Return the histogram re-binned to about n_bins bins over the observed range."""
+        occupied = np.nonzero(self.counts)[0]
+        if occupied.size == 0:
+            return pd.DataFrame(columns=['Bin Start', 'Bin End', 'Count'])
+        counts = self.counts[occupied[0]:occupied[-1] + 1]
+        group = max(1, -(-counts.size // n_bins))
+        counts = np.pad(counts, (0, -counts.size % group)).reshape(-1, group).sum(axis=1)
+        starts = self.lower + self.width * (occupied[0] + group * np.arange(counts.size))
+        return pd.DataFrame({'Bin Start': starts, 'Bin End': starts + self.width * group, 'Count': counts})
@@ -0,0 +1,244 @@
+import logging
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from historical_bootstrap import PRICE_COLUMNS, load_price_history
+from monte_carlo import MonteCarloSimulator
+from result_cache import ResultCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    ------ HISTORICAL STRESS SCENARIOS ------
+    Library of historical stress windows replayed against the hedged position, instead of stressing by hand
+    through Parameters.volatility.
+    1. STRESS_WINDOWS names the calendar windows (2008 crisis, March 2020 crash, 2022 rate shock). Each
+       (ticker, window) is extracted once as a compact float32 vector of daily log returns
+    2. Dated closes come from a STOCK_RESULTS CSV with a Date column when there is one, otherwise from
+       yfinance. A window that cannot be filled is logged and listed in StressLibrary.missing, never
+       approximated. The price histories stock_data.py caches carry no dates, so worst_window() offers the
+       worst n-day stretch of such a history as an explicitly labelled substitute
+    3. The whole library is stored in a ResultCache as one concatenated return vector plus offsets
+    4. StressLibrary.revalue() rescales every scenario to Parameters.initial_equity_price, stacks them like
+       simulated paths (held flat after a scenario ends) and values them in one value_hedged_position call
+
+    Scenarios longer than time_horizon_step are cut at the horizon. The puts are priced at Parameters.volatility
+    (or the simulator's volatility surface): the scenarios shock the stock price, not the implied volatility.
+'''
+
+DEFAULT_STRESS_DIR = os.path.join("BLACK_SCHOLES_RESULTS", "stress_scenarios")
+DEFAULT_STRESS_TICKERS = ('^GSPC',)
+STRESS_WINDOWS = {
+    '2008 Financial Crisis': ('2008-09-02', '2009-03-09'),
+    'March 2020 Crash': ('2020-02-19', '2020-03-23'),
+    '2022 Rate Shock': ('2022-01-03', '2022-10-12'),
+}
+DATE_COLUMNS = ('Date', 'Datetime')
+
+
+@dataclass
+class StressScenario:
+    name: str
+    ticker: str
+    start: str            # First date (or history day) of the window: the entry price
+    end: str              # Last date (or history day) of the window
+    returns: np.ndarray   # Daily log returns over the window, float32
+
+    @property
+    def days(self):
+        return int(self.returns.size)
+
+    @property
+    def total_return(self):
+        return float(np.expm1(self.returns.sum(dtype=float)))
+
+
+@dataclass
+class StressLibrary:
+    scenarios: list
+    missing: list = field(default_factory=list)  # (name, ticker) windows without price data
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def to_frame(self):
+        """One row per scenario: window, length, total and worst drawdown of the stock."""
+        rows = []
+        for scenario in self.scenarios:
+            prices = np.exp(np.concatenate([[0.0], np.cumsum(scenario.returns, dtype=float)]))
+            rows.append({'Scenario': scenario.name, 'Ticker': scenario.ticker, 'Start': scenario.start,
+                         'End': scenario.end, 'Days': scenario.days,
+                         'Stock Return (%)': 100 * scenario.total_return,
+                         'Max Drawdown (%)': 100 * (1 - prices / np.maximum.accumulate(prices)).max()})
+        return pd.DataFrame(rows)
+
+    def to_arrays(self):
+        """Compact form for a ResultCache: one float32 return vector, offsets and the scenario labels."""
+        lengths = [scenario.days for scenario in self.scenarios]
+        returns = [scenario.returns for scenario in self.scenarios]
+        return {
+            'returns': np.concatenate(returns).astype(np.float32) if returns else np.zeros(0, dtype=np.float32),
+            'offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            'labels': np.array([[s.name, s.ticker, s.start, s.end] for s in self.scenarios], dtype=str).reshape(-1, 4),
+            'missing': np.array(self.missing, dtype=str).reshape(-1, 2),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        offsets = arrays['offsets']
+        scenarios = [StressScenario(*map(str, labels), returns=arrays['returns'][start:end])
+                     for labels, start, end in zip(arrays['labels'], offsets[:-1], offsets[1:])]
+        return cls(scenarios=scenarios, missing=[tuple(map(str, entry)) for entry in arrays['missing']])
+
+    def stock_paths(self, initial_price, steps):
+        """(n_scenarios, steps) prices from initial_price, held flat after each scenario ends, and the lengths."""
+        returns = np.zeros((len(self.scenarios), steps))
+        lengths = np.array([min(scenario.days, steps) for scenario in self.scenarios], dtype=int)
+        for row, (scenario, length) in enumerate(zip(self.scenarios, lengths)):
+            returns[row, :length] = scenario.returns[:length]
+        return initial_price * np.exp(np.cumsum(returns, axis=1)), lengths
+
+    def revalue(self, parameters, **simulator_kwargs):
+        """
+        Replay every scenario against the hedged position of parameters in one batch.
+
+        Parameters:
+        parameters (Parameters): The position; time_horizon_step caps the scenario length.
+        **simulator_kwargs: option_style, volatility_surface, as in MonteCarloSimulator.
+
+        Returns:
+        DataFrame: One row per scenario with the P&L at its last day and the worst P&L along the way.
+        """
+        if not self.scenarios:
+            raise ValueError("The stress library has no scenarios to replay")
+        simulator = MonteCarloSimulator(parameters, **simulator_kwargs)
+        stock_prices, lengths = self.stock_paths(parameters.initial_equity_price, parameters.time_horizon_step)
+        results = simulator.value_hedged_position(stock_prices)
+        initial_value = simulator.initial_position_value()
+
+        rows = np.arange(len(lengths))
+        last_days = lengths - 1
+        pnl = results.position_values[rows, last_days] - initial_value
+        unhedged_pnl = parameters.num_shares * (stock_prices[rows, last_days] - parameters.initial_equity_price) \
+            - results.margin_interest[last_days]
+        in_window = np.arange(stock_prices.shape[1]) < lengths[:, np.newaxis]
+        worst_pnl = np.where(in_window, results.position_values, np.inf).min(axis=1) - initial_value
+
+        frame = self.to_frame()[['Scenario', 'Ticker', 'Start', 'End']]
+        return frame.assign(**{
+            'Days Replayed': lengths,
+            'Stock Return (%)': 100 * (stock_prices[rows, last_days] / parameters.initial_equity_price - 1),
+            'Rolled': (results.roll_days >= 0) & (results.roll_days <= last_days),
+            'Initial Value': initial_value,
+            'P&L': pnl,
+            'Return (%)': 100 * pnl / initial_value,
+            'Worst P&L': worst_pnl,
+            'Unhedged P&L': unhedged_pnl,
+            'Hedge P&L': pnl - unhedged_pnl,
+        })
+
+
+def load_dated_closes(ticker, start, end, directory="STOCK_RESULTS", download=True):
+    """
+    Closing prices of a ticker between start and end (inclusive), indexed by date.
+
+    Uses a dated STOCK_RESULTS CSV when one covers the window, then yfinance when download=True.
+    Returns None when no source has the window.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    for description in ('historical_data', 'ticker_data'):
+        csv_filename = os.path.join(directory, f"{ticker}_{description}.csv")
+        if not os.path.exists(csv_filename):
+            continue
+        data = pd.read_csv(csv_filename)
+        date_column = next((name for name in DATE_COLUMNS if name in data.columns), None)
+        price_column = next((name for name in PRICE_COLUMNS if name in data.columns), None)
+        if date_column is None or price_column is None:
+            continue
+        dates = pd.to_datetime(data[date_column], errors='coerce', utc=True).dt.tz_localize(None)
+        closes = pd.Series(pd.to_numeric(data[price_column], errors='coerce').to_numpy(), index=dates).dropna()
+        if closes.size and closes.index.min() <= start and closes.index.max() >= end:
+            return closes.loc[start:end]
+
+    if not download:
+        return None
+    try:
+        import yfinance as yf
+        data = yf.download(ticker, start=start.strftime('%Y-%m-%d'),
+                           end=(end + pd.Timedelta(days=1)).strftime('%Y-%m-%d'), timeout=20, progress=False)
+    except Exception as e:
+        logger.warning(f"[-] Could not download {ticker} {start.date()} to {end.date()}: {e}")
+        return None
+    if data is None or data.empty:
+        return None
+    column = next(name for name in PRICE_COLUMNS if name in data.columns)
+    closes = data[column]
+    # Recent yfinance versions return one column per ticker
+    return (closes.iloc[:, 0] if isinstance(closes, pd.DataFrame) else closes).dropna()
+
+
+def extract_scenario(name, ticker, start, end, directory="STOCK_RESULTS", download=True):
+    """The StressScenario of one ticker and window, or None when its prices are not available."""
+    closes = load_dated_closes(ticker, start, end, directory, download)
+    if closes is None or closes.size < 2:
+        return None
+    return StressScenario(name=name, ticker=ticker, start=closes.index[0].strftime('%Y-%m-%d'),
+                          end=closes.index[-1].strftime('%Y-%m-%d'),
+                          returns=np.diff(np.log(closes.to_numpy(dtype=float))).astype(np.float32))
+
+
+def worst_window(ticker, days=20, directory="STOCK_RESULTS"):
+    """The worst `days`-day stretch of a cached (undated) price history, labelled by its history days."""
+    returns = np.diff(np.log(load_price_history(ticker, directory)))
+    if returns.size < days:
+        raise ValueError(f"The {ticker} history has {returns.size} returns, fewer than {days}")
+    window_returns = np.convolve(returns, np.ones(days), mode='valid')
+    first = int(window_returns.argmin())
+    return StressScenario(name=f"Worst {days}-Day (Cached History)", ticker=ticker, start=f"day {first}",
+                          end=f"day {first + days}", returns=returns[first:first + days].astype(np.float32))
+
+
+def build_stress_library(tickers=DEFAULT_STRESS_TICKERS, windows=None, directory="STOCK_RESULTS", cache=None,
+                         download=True):
+    """
+    Extract every (window, ticker) stress scenario once and keep the library in a ResultCache.
+
+    Parameters:
+    tickers (list of str): Index and single names to extract, e.g. ['^GSPC', 'AAPL'].
+    windows (dict): Scenario name -> (start, end) dates; defaults to STRESS_WINDOWS.
+    directory (str): Folder of the cached price histories.
+    cache (ResultCache): Defaults to DEFAULT_STRESS_DIR; False disables caching.
+    download (bool): Fetch windows missing from the cached CSVs with yfinance.
+
+    Returns:
+    StressLibrary: The scenarios found; windows without data are listed in its missing attribute.
+    A library with missing windows is not cached, so a later run can fill them.
+    """
+    windows = STRESS_WINDOWS if windows is None else windows
+    if cache is None:
+        cache = ResultCache(DEFAULT_STRESS_DIR)
+    key = cache_key(kind='stress_library', tickers=list(tickers),
+                    windows={name: list(dates) for name, dates in windows.items()})
+    arrays = cache.get(key) if cache else None
+    if arrays is not None:
+        return StressLibrary.from_arrays(arrays)
+
+    scenarios, missing = [], []
+    for name, (start, end) in windows.items():
+        for ticker in tickers:
+            scenario = extract_scenario(name, ticker, start, end, directory, download)
+            if scenario is None:
+                logger.warning(f"[-] No prices for {ticker} over {name} ({start} to {end}); scenario skipped")
+                missing.append((name, ticker))
+            else:
+                logger.info(f"[+] {name} {ticker}: {scenario.days} days, {100 * scenario.total_return:.1f}%")
+                scenarios.append(scenario)
+
+    library = StressLibrary(scenarios=scenarios, missing=missing)
+    if cache and not missing:
+        cache.put(key, library.to_arrays())
+    return library
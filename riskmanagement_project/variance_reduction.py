@@ -0,0 +1,144 @@
+import numpy as np
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+from black_scholes import black_scholes_put
+
+
+'''
+    ------ VARIANCE REDUCTION ------
+    Drop-in replacements for the plain standard normal draws of the GBM path generator, plus a control-variate
+    estimator for the mean position value.
+    1. Antithetic variates - every draw z is paired with -z, so the pair average cancels odd-order noise
+    2. Sobol quasi-random normals - scrambled low-discrepancy points mapped through the inverse normal CDF and
+       turned into Brownian paths with a Brownian bridge, so the first (best distributed) Sobol dimensions
+       drive the terminal value and the coarse shape of each path
+    3. Control variates - quantities whose expectation is known in closed form (the terminal stock price and a
+       European put on it, priced with the Black-Scholes formula) are regressed out of the simulated values
+
+    Each block of paths is one independent draw (one antithetic set or one scrambled Sobol replicate), which
+    is what standard_error() relies on when it groups the paths into independent samples.
+'''
+
+VARIANCE_REDUCTION_METHODS = ('plain', 'antithetic', 'sobol')
+
+
+def antithetic_normals(rng, n_paths, steps):
+    """(n_paths x steps) standard normals where row i + ceil(n_paths / 2) is the negation of row i."""
+    half = -(-n_paths // 2)
+    normals = rng.standard_normal(size=(half, steps))
+    return np.concatenate([normals, -normals])[:n_paths]
+
+
+def sobol_normals(rng, n_paths, steps):
+    """
+    (n_paths x steps) standard normals from a Sobol sequence scrambled with rng.
+
+    Points are drawn as a full power-of-two set and cut to n_paths, so the balance properties of the sequence
+    hold exactly whenever n_paths is a power of two.
+    """
+    sampler = qmc.Sobol(d=steps, scramble=True, seed=rng)
+    uniforms = sampler.random_base2(int(np.ceil(np.log2(max(n_paths, 1)))))[:n_paths]
+    # Scrambled points never sit exactly on 0 or 1 in practice; the clip keeps ndtri finite regardless
+    np.clip(uniforms, 1e-12, 1 - 1e-12, out=uniforms)
+    return ndtri(uniforms)
+
+
+def _bridge_schedule(steps):
+    """Order in which a Brownian bridge fills the steps: (index, left neighbour, right neighbour), -1 = t0."""
+    schedule = [(steps - 1, -1, -1)]
+    intervals = [(-1, steps - 1)]
+    while intervals:
+        next_intervals = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            middle = (left + right) // 2
+            schedule.append((middle, left, right))
+            next_intervals += [(left, middle), (middle, right)]
+        intervals = next_intervals
+    return schedule
+
+
+def brownian_bridge(normals, times):
+    """
+    Build Brownian motion values W(times) from standard normals with the Brownian-bridge construction.
+
+    Parameters:
+    normals (array): (n_paths, steps) standard normals; column 0 sets the terminal value, later columns
+                     fill in midpoints, coarse to fine.
+    times (array): (steps,) increasing observation times, all > 0.
+
+    Returns:
+    array: (n_paths, steps) Brownian motion, the same law as cumulative sums of independent increments.
+    """
+    n_paths, steps = normals.shape
+    brownian = np.empty_like(normals)
+    for k, (index, left, right) in enumerate(_bridge_schedule(steps)):
+        if right < 0:
+            brownian[:, index] = np.sqrt(times[index]) * normals[:, k]
+            continue
+        left_time = times[left] if left >= 0 else 0.0
+        left_value = brownian[:, left] if left >= 0 else 0.0
+        weight = (times[index] - left_time) / (times[right] - left_time)
+        spread = np.sqrt(weight * (times[right] - times[index]))
+        brownian[:, index] = left_value + weight * (brownian[:, right] - left_value) + spread * normals[:, k]
+    return brownian
+
+
+def lognormal_control_means(initial_price, log_drift, log_variance, put_strike):
+    """
+    Closed-form expectations of S_T and of the European put payoff max(K - S_T, 0) when
+    log(S_T / S_0) ~ N(log_drift, log_variance).
+
+    The put expectation is the Black-Scholes put price on the forward E[S_T] with a zero rate and one unit
+    of time at volatility sqrt(log_variance).
+    """
+    forward = initial_price * np.exp(log_drift + 0.5 * log_variance)
+    return np.array([forward, black_scholes_put(forward, put_strike, 1.0, 0.0, np.sqrt(log_variance))])
+
+
+def control_variate_adjust(values, controls, control_means):
+    """
+    Regress the controls out of the simulated values.
+
+    Parameters:
+    values (array): (n_paths,) simulated values.
+    controls (array): (n_paths, k) control quantities simulated on the same paths.
+    control_means (array): (k,) known expectations of the controls.
+
+    Returns:
+    tuple: (adjusted values whose mean is the control-variate estimate, fitted coefficients).
+    """
+    controls = np.asarray(controls, dtype=float).reshape(len(values), -1)
+    centred = controls - controls.mean(axis=0)
+    beta = np.linalg.lstsq(centred, values - values.mean(), rcond=None)[0]
+    return values - (controls - control_means) @ beta, beta
+
+
+def independent_samples(values, block_sizes, method):
+    """
+    Group per-path values (paths on the last axis) into independent samples for the standard error.
+
+    plain: every path; antithetic: the average of each antithetic pair; sobol: the mean of each block
+    (every block is an independently scrambled replicate).
+    """
+    if method == 'plain':
+        return values
+    blocks = np.split(values, np.cumsum(block_sizes)[:-1], axis=-1)
+    if method == 'sobol':
+        return np.stack([block.mean(axis=-1) for block in blocks], axis=-1)
+    samples = []
+    for block in blocks:
+        half = -(-block.shape[-1] // 2)
+        paired = block.shape[-1] - half
+        samples += [0.5 * (block[..., :paired] + block[..., half:]), block[..., paired:half]]
+    return np.concatenate(samples, axis=-1)
+
+
+def standard_error(values, block_sizes, method):
+    """Mean of the values (over the last axis) and its standard error under the given variance-reduction method."""
+    samples = independent_samples(values, block_sizes, method)
+    if samples.shape[-1] < 2:
+        return values.mean(axis=-1), np.full(samples.shape[:-1], np.nan)[()]
+    return values.mean(axis=-1), samples.std(ddof=1, axis=-1) / np.sqrt(samples.shape[-1])
@@ -0,0 +1,240 @@
+import datetime
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import PchipInterpolator
+
+from implied_volatility import add_implied_volatility
+from result_cache import ResultCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    ------ IMPLIED VOLATILITY SURFACE ------
+    Smile-consistent volatilities for pricing the puts, instead of one constant Parameters.volatility.
+    1. VolatilitySurface.from_option_chains() fetches every listed expiration of a ticker, solves the implied
+       volatility of the out-of-the-money contracts (puts below spot, calls above) and builds the surface
+    2. Each expiry's smile is smoothed across strikes with a monotone cubic (PCHIP) in log-moneyness
+       ln(K / spot) and sampled on one uniform grid; outside the quoted strikes the smile is flat
+    3. Across maturities the total variance sigma^2 * T is interpolated linearly, with flat volatility before
+       the first and after the last expiry
+    4. The interpolated surface is tabulated once on a uniform (daily maturity x log-moneyness) grid, so a lookup
+       is pure array arithmetic: the cell comes straight from the coordinates and four np.take calls read its
+       corners. Millions of (strike, T) points cost a few array passes
+    5. load_volatility_surface() keeps one surface per ticker and snapshot date in a ResultCache
+
+    sticky='strike' reads the smile at K / reference price (the volatility of a strike does not move with the
+    simulated stock), sticky='moneyness' at K / current stock price.
+'''
+
+DEFAULT_SURFACE_DIR = os.path.join("BLACK_SCHOLES_RESULTS", "volatility_surfaces")
+DEFAULT_GRID_POINTS = 201
+TABLE_TIME_STEP = 1 / 252  # Maturity spacing of the lookup table (one trading day)
+MIN_TIME = 1e-8
+
+
+@dataclass
+class VolatilitySurface:
+    log_moneyness: np.ndarray    # (n_grid,) uniform grid of ln(K / spot)
+    maturities: np.ndarray       # (n_maturities,) years, increasing
+    total_variance: np.ndarray   # (n_maturities, n_grid) sigma^2 * T on the grid
+    spot: float                  # Price of the underlying when the quotes were taken
+    ticker: str = 'custom'
+    snapshot_date: str = None
+    sticky: str = 'strike'       # 'strike' or 'moneyness', see implied_volatility()
+
+    def __post_init__(self):
+        if self.sticky not in ('strike', 'moneyness'):
+            raise ValueError(f"Unknown sticky rule '{self.sticky}' (use 'strike' or 'moneyness')")
+
+    @classmethod
+    def from_quotes(cls, spot, strikes, maturities, volatilities, grid_points=DEFAULT_GRID_POINTS, **kwargs):
+        """
+        Build a surface from scattered implied-volatility quotes.
+
+        Parameters:
+        spot (float): Price of the underlying.
+        strikes, maturities, volatilities (arrays): One entry per quote (maturities in years); NaN quotes are
+                                                    ignored.
+        grid_points (int): Points of the uniform log-moneyness grid.
+        **kwargs: ticker, snapshot_date, sticky.
+
+        Returns:
+        VolatilitySurface
+        """
+        quotes = pd.DataFrame({'x': np.log(np.asarray(strikes, dtype=float) / spot),
+                               't': np.asarray(maturities, dtype=float),
+                               'vol': np.asarray(volatilities, dtype=float)})
+        quotes = quotes[np.isfinite(quotes['x']) & (quotes['t'] > 0) & (quotes['vol'] > 0)]
+        if quotes.empty:
+            raise ValueError("No usable implied-volatility quotes to build a surface from")
+
+        grid = np.linspace(quotes['x'].min(), quotes['x'].max(), grid_points)
+        if grid[-1] == grid[0]:
+            grid = grid[0] + np.linspace(-0.5, 0.5, grid_points)
+        maturities, smiles = [], []
+        for maturity, smile in quotes.groupby('t'):
+            # Duplicate strikes (e.g. a put and a call) are averaged
+            smile = smile.groupby('x')['vol'].mean()
+            x = np.clip(grid, smile.index[0], smile.index[-1])
+            vol = PchipInterpolator(smile.index, smile.to_numpy())(x) if smile.size > 1 \
+                else np.full(grid.size, smile.iloc[0])
+            maturities.append(maturity)
+            smiles.append(vol ** 2 * maturity)
+        return cls(log_moneyness=grid, maturities=np.array(maturities), total_variance=np.array(smiles),
+                   spot=float(spot), **kwargs)
+
+    @classmethod
+    def from_option_chains(cls, ticker, risk_free_rate=0.01, max_expirations=None, **kwargs):
+        """Fetch the listed option chains of a ticker with yfinance and build today's surface."""
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        spot = stock.history(period="5d")["Close"].iloc[-1]
+        today = datetime.date.today()
+        strikes, maturities, volatilities = [], [], []
+        for expiration in stock.options[:max_expirations]:
+            time_to_expiration = np.busday_count(today, datetime.date.fromisoformat(expiration)) / 252
+            if time_to_expiration <= 0:
+                continue
+            chain = stock.option_chain(expiration)
+            # Out-of-the-money contracts only: their quotes are the most liquid and carry the least parity noise
+            for options, option_type in ((chain.puts[chain.puts['strike'] <= spot], 'put'),
+                                         (chain.calls[chain.calls['strike'] > spot], 'call')):
+                options = add_implied_volatility(options, spot, time_to_expiration, risk_free_rate, option_type)
+                strikes.append(options['strike'].to_numpy(dtype=float))
+                volatilities.append(options['Implied Volatility'].to_numpy())
+                maturities.append(np.full(len(options), time_to_expiration))
+        logger.info(f"[!] Building the {ticker} volatility surface from {sum(map(len, strikes))} quotes")
+        return cls.from_quotes(spot, np.concatenate(strikes), np.concatenate(maturities),
+                               np.concatenate(volatilities), ticker=ticker, snapshot_date=today.isoformat(),
+                               **kwargs)
+
+    def volatility(self, log_moneyness, time_to_expiration):
+        """Implied volatility at ln(K / spot) and time to expiration (broadcastable arrays), via the table."""
+        table = self._table()
+        n_grid = self.log_moneyness.size
+        x = np.clip((np.asarray(log_moneyness, dtype=float) - self.log_moneyness[0])
+                    * ((n_grid - 1) / (self.log_moneyness[-1] - self.log_moneyness[0])), 0, n_grid - 1)
+        t = np.clip(np.asarray(time_to_expiration, dtype=float) / TABLE_TIME_STEP, 0, table.shape[0] - 1)
+        x, t = np.broadcast_arrays(x, t)
+        column = np.minimum(x.astype(np.intp), n_grid - 2)
+        row = np.minimum(t.astype(np.intp), table.shape[0] - 2)
+        x_weight = x - column
+        t_weight = t - row
+
+        corner = row * n_grid + column
+        flat = table.ravel()
+        near = np.take(flat, corner) * (1 - x_weight) + np.take(flat, corner + 1) * x_weight
+        corner += n_grid
+        far = np.take(flat, corner) * (1 - x_weight) + np.take(flat, corner + 1) * x_weight
+        vol = near + (far - near) * t_weight
+        return vol[()] if vol.ndim == 0 else vol
+
+    def _table(self):
+        """Volatilities on the daily maturity grid x log-moneyness grid, built on first use."""
+        table = getattr(self, '_volatility_table', None)
+        if table is None:
+            times = TABLE_TIME_STEP * np.arange(max(2, int(np.ceil(self.maturities[-1] / TABLE_TIME_STEP)) + 1))
+            table = self.interpolate(self.log_moneyness, times[:, np.newaxis])
+            self._volatility_table = table
+        return table
+
+    def interpolate(self, log_moneyness, time_to_expiration):
+        """Exact surface interpolation (PCHIP smile grid, linear in total variance across expiries)."""
+        x, t = np.broadcast_arrays(np.asarray(log_moneyness, dtype=float),
+                                   np.asarray(time_to_expiration, dtype=float))
+        grid = self.log_moneyness
+        position = np.clip((x - grid[0]) / (grid[1] - grid[0]), 0, grid.size - 1)
+        left = np.minimum(position.astype(np.intp), grid.size - 2)
+        weight = position - left
+
+        t = np.maximum(t, MIN_TIME)
+        upper = np.clip(np.searchsorted(self.maturities, t), 0, self.maturities.size - 1)
+        lower = np.maximum(upper - 1, 0)
+
+        def variance(row):
+            # Smile of one maturity at x, as an annualised variance
+            return (self.total_variance[row, left] * (1 - weight)
+                    + self.total_variance[row, left + 1] * weight) / self.maturities[row]
+
+        lower_variance, upper_variance = variance(lower), variance(upper)
+        lower_time, upper_time = self.maturities[lower], self.maturities[upper]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(upper > lower, (t - lower_time) / (upper_time - lower_time), 1.0)
+        fraction = np.clip(fraction, 0.0, 1.0)
+        # Linear in total variance between the bracketing expiries, flat volatility outside them
+        total = (1 - fraction) * lower_variance * lower_time + fraction * upper_variance * upper_time
+        inside = (t > lower_time) & (t < upper_time)
+        vol = np.sqrt(np.where(inside, total / t, np.where(t <= lower_time, lower_variance, upper_variance)))
+        return vol[()] if vol.ndim == 0 else vol
+
+    def implied_volatility(self, equity_price, strike, time_to_expiration, reference_price=None):
+        """
+        Volatility for pricing puts struck at strike.
+
+        Parameters:
+        equity_price (float or array): Current (simulated) stock price, used when sticky='moneyness'.
+        strike, time_to_expiration (float or array): Put strikes and years to expiration.
+        reference_price (float): Stock price that maps to the surface's spot when sticky='strike'
+                                 (defaults to the surface's own spot).
+        """
+        if self.sticky == 'moneyness':
+            base = equity_price
+        else:
+            base = self.spot if reference_price is None else reference_price
+        return self.volatility(np.log(np.asarray(strike, dtype=float) / base), time_to_expiration)
+
+    def describe(self):
+        """Identity of the surface, e.g. for result-cache keys."""
+        return {'ticker': self.ticker, 'snapshot_date': self.snapshot_date, 'sticky': self.sticky,
+                'surface_sha256': hashlib.sha256(np.concatenate([
+                    self.log_moneyness, self.maturities, self.total_variance.ravel()]).tobytes()).hexdigest()}
+
+    def to_frame(self, moneyness=(0.8, 0.9, 1.0, 1.1, 1.2)):
+        """Volatilities at a few strikes (as K / spot) for every expiry, for display."""
+        return pd.DataFrame({f'K/S={m:g}': self.volatility(np.log(m), self.maturities) for m in moneyness},
+                            index=pd.Index(self.maturities, name='Maturity'))
+
+    def to_arrays(self):
+        return {'log_moneyness': self.log_moneyness, 'maturities': self.maturities,
+                'total_variance': self.total_variance, 'spot': np.array(self.spot),
+                'ticker': np.array(self.ticker), 'snapshot_date': np.array(self.snapshot_date or '')}
+
+    @classmethod
+    def from_arrays(cls, arrays, **kwargs):
+        return cls(log_moneyness=arrays['log_moneyness'], maturities=arrays['maturities'],
+                   total_variance=arrays['total_variance'], spot=float(arrays['spot']),
+                   ticker=str(arrays['ticker']), snapshot_date=str(arrays['snapshot_date']) or None, **kwargs)
+
+
+def load_volatility_surface(ticker, snapshot_date=None, cache=None, **kwargs):
+    """
+    The surface of a ticker on a snapshot date, from the cache or (for today) freshly fetched and cached.
+
+    Parameters:
+    ticker (str): Underlying symbol.
+    snapshot_date (str): YYYY-MM-DD; defaults to today. Past dates can only come from the cache.
+    cache (ResultCache): Defaults to DEFAULT_SURFACE_DIR.
+    **kwargs: Passed to VolatilitySurface.from_option_chains (risk_free_rate, max_expirations, grid_points).
+    """
+    today = datetime.date.today().isoformat()
+    snapshot_date = snapshot_date or today
+    cache = cache or ResultCache(DEFAULT_SURFACE_DIR)
+    key = cache_key(kind='volatility_surface', ticker=ticker, snapshot_date=snapshot_date)
+    sticky = kwargs.pop('sticky', 'strike')
+
+    arrays = cache.get(key)
+    if arrays is not None:
+        return VolatilitySurface.from_arrays(arrays, sticky=sticky)
+    if snapshot_date != today:
+        raise FileNotFoundError(f"No cached {ticker} volatility surface for {snapshot_date}; "
+                                f"option chains can only be fetched for today ({today})")
+    surface = VolatilitySurface.from_option_chains(ticker, sticky=sticky, **kwargs)
+    cache.put(key, surface.to_arrays())
+    return surface